@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import parse_file
+from benchmarks.generate import generate_tree
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(files=40, repeat=5):
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        root = generate_tree(os.path.join(workdir, 'src'), files=files)
+        cache_dir = os.path.join(workdir, 'cache')
+        
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            parse_file(root, cache_dir=cache_dir)
+        
+        uncached = timed(lambda: parse_file(root), repeat)
+        cold_time = timed(cold, repeat)
+        parse_file(root, cache_dir=cache_dir)
+        warm_time = timed(lambda: parse_file(root, cache_dir=cache_dir), repeat)
+        
+        print(f'files:     {files + 1}')
+        print(f'no cache:  {uncached * 1000:8.2f} ms')
+        print(f'cold:      {cold_time * 1000:8.2f} ms')
+        print(f'warm:      {warm_time * 1000:8.2f} ms  ({uncached / warm_time:.1f}x)')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
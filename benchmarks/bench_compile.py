@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import lex, Parser, ZovInterpreter, compile_document
+from benchmarks.generate import generate_source
+
+
+def per_run(func, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs
+
+
+def main(categories=100, runs=20):
+    document = Parser(lex(generate_source(categories=categories))).parse()
+
+    def interpret():
+        interpreter = ZovInterpreter()
+        interpreter.eval(document)
+        return interpreter.to_dict()
+
+    start = time.perf_counter()
+    compiled = compile_document(document)
+    compile_time = time.perf_counter() - start
+    assert compiled.run() == interpret()
+
+    tree = per_run(interpret, runs)
+    closures = per_run(lambda: compiled.run(env={'TENANT': 'a'}), runs)
+
+    print(f'compile once:     {compile_time * 1000:8.2f} ms')
+    print(f'interpreter/run:  {tree * 1000:8.2f} ms')
+    print(f'compiled/run:     {closures * 1000:8.2f} ms  ({tree / closures:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
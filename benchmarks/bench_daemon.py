@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import load_zov, ConfigServer, ConfigClient
+from benchmarks.generate import generate_tree
+
+
+def best(func, repeat=5):
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def main(files=10, requests=1000):
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        root = generate_tree(workdir, files)
+        server = ConfigServer(os.path.join(workdir, 'zov.sock'))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        while not os.path.exists(server.socket_path):
+            time.sleep(0.01)
+        
+        with ConfigClient(server.socket_path) as client:
+            category = next(iter(client.load(root)))
+            
+            def cached(path, count):
+                for _ in range(count):
+                    client.load(root, path)
+            
+            # A whole document response is dominated by decoding the JSON in
+            # the client, so it is timed over fewer requests.
+            print(f'load_zov:           {best(lambda: load_zov(root), 3) * 1000:8.3f} ms')
+            print(f'daemon, document:   {best(lambda: cached(None, 10), 3) / 10 * 1000:8.3f} ms')
+            print(f'daemon, category:   {best(lambda: cached(category, requests)) / requests * 1000:8.3f} ms')
+        
+        server.shutdown()
+        thread.join()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import hashlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import ZovInterpreter, FUNCTIONS
+from zov.lexer import lex
+from zov.parser import Parser
+
+
+def best(func, repeat):
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def derive(value):
+    return hashlib.pbkdf2_hmac('sha256', str(value).encode(), b'zov', 200).hex()
+
+
+def generate(calls, distinct=50):
+    lines = ['Calls {']
+    for i in range(calls):
+        lines.append(f'    d_{i} = derive("key-{i % distinct}");')
+        lines.append(f'    u_{i} = upper("name-{i}");')
+        lines.append(f'    c_{i} = concat("a", {i}, "b");')
+        lines.append(f'    e_{i} = env("ZOV_BENCH_{i % 10}", "default");')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def main(calls=2000, repeat=5):
+    registry = FUNCTIONS.copy()
+    registry.register('derive', derive, arity=1, pure=True)
+    uncached = FUNCTIONS.copy()
+    uncached.register('derive', derive, arity=1, pure=True, cache=False)
+    
+    ast = Parser(lex(generate(calls))).parse()
+    
+    def load(functions, environ=None):
+        ZovInterpreter(environ=environ, functions=functions).eval(ast)
+    
+    # The first load fills the cache; every later one, like a reload of the
+    # same file, is served from it.
+    registry.clear_cache()
+    start = time.perf_counter()
+    load(registry)
+    cold = time.perf_counter() - start
+    warm = best(lambda: load(registry), repeat)
+    plain = best(lambda: load(uncached), repeat)
+    
+    print(f'{calls * 4} calls, {calls} to a pure function with 50 distinct arguments')
+    print(f'not cached:                 {plain * 1000:9.2f} ms')
+    print(f'cached, first load:         {cold * 1000:9.2f} ms ({plain / cold:.1f}x)')
+    print(f'cached, later loads:        {warm * 1000:9.2f} ms ({plain / warm:.1f}x, {registry.hits} hits, {registry.misses} misses)')
+    
+    # Built-ins only: the cost of dispatch, arity checks and the call itself.
+    builtins = Parser(lex(generate(calls).replace('derive(', 'lower('))).parse()
+    elapsed = best(lambda: ZovInterpreter().eval(builtins), repeat)
+    print(f'built-in call:              {elapsed / (calls * 4) * 1e6:9.2f} us')
+    
+    # The snapshot includes copying os.environ once per load.
+    lookups = Parser(lex('Env {\n' + ''.join(f'    e_{i} = env("ZOV_BENCH_{i % 10}", "default");\n' for i in range(calls * 4)) + '}')).parse()
+    snapshot = best(lambda: ZovInterpreter().eval(lookups), repeat)
+    live = best(lambda: ZovInterpreter(environ=os.environ).eval(lookups), repeat)
+    print(f'env(), snapshot:            {snapshot * 1000:9.2f} ms')
+    print(f'env(), os.environ:          {live * 1000:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zov.parser
+from zov import parse_file
+from benchmarks.generate import generate_tree
+from benchmarks.bench_cache import timed
+
+
+def with_latency(delay):
+    # Stands in for a network filesystem: every include read waits first.
+    read_source = zov.parser.read_source
+    lex_file = zov.parser.lex_file
+    
+    def slow_read(path, fingerprints=None):
+        time.sleep(delay)
+        return read_source(path, fingerprints)
+    
+    def slow_lex(path):
+        time.sleep(delay)
+        return lex_file(path)
+    
+    zov.parser.read_source = slow_read
+    zov.parser.lex_file = slow_lex
+
+
+def main(files=40, latency=0.01, workers=8, repeat=3):
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        root = generate_tree(os.path.join(workdir, 'src'), files=files, categories=5)
+        with_latency(latency)
+        
+        sequential = timed(lambda: parse_file(root), repeat)
+        threads = timed(lambda: parse_file(root, workers=workers), repeat)
+        processes = timed(lambda: parse_file(root, workers=workers, processes=True), repeat)
+        
+        print(f'files:      {files + 1} ({latency * 1000:.0f} ms simulated read latency)')
+        print(f'sequential: {sequential * 1000:8.2f} ms')
+        print(f'threads:    {threads * 1000:8.2f} ms  ({sequential / threads:.1f}x)')
+        print(f'processes:  {processes * 1000:8.2f} ms  ({sequential / processes:.1f}x)')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
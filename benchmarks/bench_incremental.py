@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import load_zov, ReloadableConfig
+from zov.lexer import lex
+from zov.parser import DeferredParser
+from zov.incremental import IncrementalDocument
+from benchmarks.generate import generate_source
+
+
+def best(func, repeat):
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def edit_latency(document, position, text, repeat):
+    # Each edit is undone right away, so every run sees the same text.
+    removed = ''
+    
+    def run():
+        document.edit(position, position + len(removed), text)
+        document.edit(position, position + len(text), removed)
+    
+    return best(run, repeat) / 2
+
+
+def main(categories=400, repeat=5):
+    code = generate_source(categories=categories, depth=3, items=10)
+    lines = code.count('\n')
+    
+    full = best(lambda: DeferredParser(lex(code)).parse(), 3)
+    document = IncrementalDocument(code)
+    middle = code.index('key_3', len(code) // 2)
+    
+    print(f'{len(code) / 1e6:.2f} MB, {lines} lines, {len(document.chunks)} top-level statements')
+    print(f'full lex + parse:           {full * 1000:9.2f} ms')
+    print(f'keystroke, middle:          {edit_latency(document, middle, "x", repeat) * 1000:9.2f} ms')
+    print(f'new line, middle:           {edit_latency(document, middle, chr(10), repeat) * 1000:9.2f} ms')
+    print(f'new line, first statement:  {edit_latency(document, code.index("key_3"), chr(10), repeat) * 1000:9.2f} ms')
+    
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        path = os.path.join(workdir, 'main.zov')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        
+        start = time.perf_counter()
+        load_zov(path)
+        cold = time.perf_counter() - start
+        
+        # Edit to result: the file is rewritten and poll() re-reads it,
+        # re-parses the touched statement and re-evaluates its category.
+        config = ReloadableConfig(path)
+        latency = float('inf')
+        for edit in range(repeat):
+            code = code[:middle] + f'edited_{edit} = {edit};\n' + code[middle:]
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(code)
+            start = time.perf_counter()
+            changed = config.poll()
+            latency = min(latency, time.perf_counter() - start)
+            assert len(changed) == 1, changed
+        
+        print(f'load_zov:                   {cold * 1000:9.2f} ms')
+        print(f'edit to result (poll):      {latency * 1000:9.2f} ms')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import lex
+from benchmarks.generate import generate_source
+
+
+def throughput(code, repeat=3):
+    size = len(code.encode('utf-8'))
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in lex(code))
+        best = min(best, time.perf_counter() - start)
+    return size / best / (1024 * 1024), count, best
+
+
+def main(categories=400):
+    code = generate_source(categories=categories)
+    mb_per_s, tokens, elapsed = throughput(code)
+    print(f'source:     {len(code) / (1024 * 1024):.2f} MB, {tokens} tokens')
+    print(f'time:       {elapsed * 1000:.1f} ms')
+    print(f'throughput: {mb_per_s:.2f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
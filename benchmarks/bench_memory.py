@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import lex, Parser, ZovInterpreter
+from benchmarks.generate import generate_source
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+
+def main(categories=500, depth=2, items=10):
+    source = generate_source(categories=categories, depth=depth, items=items)
+    
+    document, parse_time, retained, parse_peak = measure(lambda: Parser(lex(source)).parse())
+    
+    def evaluate():
+        interpreter = ZovInterpreter()
+        interpreter.eval(document)
+        return interpreter
+    
+    interpreter, eval_time, eval_retained, eval_peak = measure(evaluate)
+    
+    print(f'source:        {len(source) / 1e6:8.2f} MB')
+    print(f'ast retained:  {retained / 1e6:8.2f} MB  (peak {parse_peak / 1e6:.2f} MB, {parse_time:.2f} s)')
+    print(f'eval retained: {eval_retained / 1e6:8.2f} MB  (peak {eval_peak / 1e6:.2f} MB, {eval_time:.2f} s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import io
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import lex, Parser, ZovInterpreter, write_json, write_binary, loads_binary
+from benchmarks.generate import generate_source
+
+
+def best(func, repeat=5):
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def main(categories=300):
+    interpreter = ZovInterpreter()
+    interpreter.eval(Parser(lex(generate_source(categories=categories))).parse())
+    
+    def dumped():
+        out = io.StringIO()
+        out.write(json.dumps(interpreter.to_dict(), indent=2, ensure_ascii=False))
+        return out.getvalue().encode('utf-8')
+    
+    def streamed(indent):
+        out = io.StringIO()
+        write_json(interpreter.view(), out, indent)
+        return out.getvalue().encode('utf-8')
+    
+    def binary():
+        out = io.BytesIO()
+        write_binary(interpreter.view(), out)
+        return out.getvalue()
+    
+    formats = [
+        ('json.dumps', dumped),
+        ('stream json', lambda: streamed(2)),
+        ('stream compact', lambda: streamed(None)),
+        ('binary', binary),
+    ]
+    for name, func in formats:
+        size = len(func())
+        print(f'{name:<15} {size / 1e6:8.2f} MB {best(func) * 1000:9.2f} ms')
+    
+    encoded = binary()
+    print(f'{"binary read":<15} {"":>11} {best(lambda: loads_binary(encoded)) * 1000:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import load_zov, ReloadableConfig
+from benchmarks.generate import generate_tree
+
+
+def main(files=40, edits=5):
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        root = generate_tree(workdir, files, fanout=4)
+        
+        start = time.perf_counter()
+        load_zov(root)
+        full = time.perf_counter() - start
+        
+        config = ReloadableConfig(root)
+        parses = config.store.parses
+        best = float('inf')
+        for edit in range(edits):
+            path = os.path.join(workdir, f'part_{files - 1 - edit}.zov')
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(f'\nEdited_{edit} {{ value = {edit}; }}\n')
+            
+            start = time.perf_counter()
+            changed = config.poll()
+            best = min(best, time.perf_counter() - start)
+            assert changed == [f'Edited_{edit}'], changed
+        
+        start = time.perf_counter()
+        config.poll()
+        idle = time.perf_counter() - start
+        
+        print(f'load_zov:          {full * 1000:9.2f} ms ({files} files)')
+        print(f'reload, one file:  {best * 1000:9.2f} ms ({(config.store.parses - parses) // edits} file parsed per edit)')
+        print(f'poll, no change:   {idle * 1000:9.2f} ms')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
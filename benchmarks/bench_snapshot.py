@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import load_zov, load_interpreter, Snapshot, write_snapshot
+from benchmarks.generate import generate_source
+
+
+def best(func, repeat=5):
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def peak(func):
+    tracemalloc.start()
+    func()
+    _, result = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result
+
+
+def main(categories=300):
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        source = os.path.join(workdir, 'big.zov')
+        target = os.path.join(workdir, 'big.zovs')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(generate_source(categories=categories))
+        write_snapshot(load_interpreter(source).view(), target)
+        with Snapshot(target) as snapshot:
+            path = max(snapshot.paths(), key=len)
+        
+        def startup():
+            load_zov(source)
+        
+        def mapped():
+            with Snapshot(target) as snapshot:
+                snapshot.get_category(path)
+        
+        print(f'snapshot:        {os.path.getsize(target) / 1e6:8.2f} MB')
+        print(f'load_zov:        {best(startup) * 1000:8.2f} ms {peak(startup) / 1e6:8.2f} MB peak')
+        print(f'snapshot lookup: {best(mapped) * 1000:8.2f} ms {peak(mapped) / 1e6:8.2f} MB peak')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import parse_file
+from zov.lexer import split_source
+from zov.parser import SPLIT_SIZE
+from benchmarks.generate import generate_source
+
+
+def best(func, repeat):
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def main(categories=600, repeat=3, workers=(1, 2, 4, 8)):
+    code = generate_source(categories=categories, depth=3, items=10)
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        path = os.path.join(workdir, 'large.zov')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        
+        scan = best(lambda: split_source(code, SPLIT_SIZE // 4), repeat)
+        sequential = best(lambda: parse_file(path), repeat)
+        statements = len(parse_file(path).categories)
+        
+        print(f'{len(code) / 1e6:.2f} MB, {statements} top-level statements, {os.cpu_count()} CPUs')
+        print(f'boundary scan:     {scan * 1000:9.2f} ms')
+        print(f'sequential:        {sequential * 1000:9.2f} ms')
+        for count in workers:
+            # Includes starting the pool, as a load_zov call would.
+            elapsed = best(lambda: parse_file(path, workers=count, processes=True), repeat)
+            pieces = len(split_source(code, max(SPLIT_SIZE // 4, len(code) // (count * 4))))
+            print(f'{count} workers:         {elapsed * 1000:9.2f} ms ({sequential / elapsed:.2f}x, {pieces} pieces)')
+        
+        assert len(parse_file(path, workers=2, processes=True).categories) == statements
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import shutil
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import lex, Parser, parse_file
+from benchmarks.generate import generate_source
+
+
+def peak(func):
+    tracemalloc.start()
+    func()
+    _, result = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result
+
+
+def main(categories=300):
+    workdir = tempfile.mkdtemp(prefix='zov-bench-')
+    try:
+        path = os.path.join(workdir, 'big.zov')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generate_source(categories=categories))
+        
+        def materialized():
+            with open(path, 'r', encoding='utf-8') as f:
+                Parser(list(lex(f.read()))).parse()
+        
+        def streamed():
+            with open(path, 'r', encoding='utf-8') as f:
+                Parser(lex(f.read())).parse()
+        
+        listed = peak(materialized)
+        generator = peak(streamed)
+        chunked = peak(lambda: parse_file(path))
+        
+        print(f'source:         {os.path.getsize(path) / 1e6:8.2f} MB')
+        print(f'token list:     {listed / 1e6:8.2f} MB peak')
+        print(f'token stream:   {generator / 1e6:8.2f} MB peak')
+        print(f'chunked file:   {chunked / 1e6:8.2f} MB peak')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import lex
+
+CASES = {
+    'long plain string': lambda n: 'x = "' + 'a' * (n * 10) + '";',
+    'many $var': lambda n: 'x = "' + '$v ' * n + '";',
+    'many lone $': lambda n: 'x = "' + '$ ' * n + '";',
+    'many ${expr}': lambda n: 'x = "' + '${a + 1}' * n + '";',
+    'many escapes': lambda n: 'x = "' + '\\"$v' * n + '";',
+    'unclosed ${': lambda n: 'x = "$v ' + '${a ' * n + '";',
+    'unterminated string': lambda n: 'x = "' + '$v ${' * n,
+    'many strings': lambda n: 'x = ' + ', '.join('"$v-${v}"' for _ in range(n)) + ';',
+}
+
+SIZES = (1000, 2000, 4000, 8000)
+
+# An 8x larger input may take at most 16x longer; quadratic scanning would be 64x.
+MAX_GROWTH = 16.0
+
+
+def measure(code, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            for _ in lex(code):
+                pass
+        except SyntaxError:
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    failed = []
+    for name, make in CASES.items():
+        times = [measure(make(n)) for n in SIZES]
+        growth = times[-1] / times[0]
+        status = 'ok' if growth <= MAX_GROWTH else 'SUPERLINEAR'
+        if status != 'ok':
+            failed.append(name)
+        cells = '  '.join(f'{t * 1000:8.3f}' for t in times)
+        print(f'{name:20} {cells} ms  growth x{growth:.2f}  {status}')
+    
+    if failed:
+        print(f'\nsuperlinear lexing: {", ".join(failed)}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import TrackingInterpreter, FUNCTIONS
+from zov.lexer import lex
+from zov.parser import Parser
+
+
+def best(func, repeat):
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def secret(interp, name, default=None):
+    return interp.environ.get('SECRET_' + str(name), default)
+
+
+def generate(categories, items=20):
+    # Every category reads one variable of its own: half through env(),
+    # half through secret(), a context function reading interp.environ.
+    lines = []
+    for i in range(categories):
+        lookup = f'env("ZOV_BENCH_{i}", "none")' if i % 2 else f'secret("{i}", "none")'
+        lines.append(f'$v_{i} = {lookup};')
+        lines.append(f'C_{i} {{')
+        for j in range(items):
+            lines.append(f'    i_{j} = "${{$v_{i}}}-{j}";')
+        lines.append('}')
+    return '\n'.join(lines)
+
+
+def environ(categories, changed=None):
+    result = {}
+    for i in range(categories):
+        name = f'ZOV_BENCH_{i}' if i % 2 else f'SECRET_{i}'
+        result[name] = 'new' if i == changed else 'old'
+    return result
+
+
+def main(categories=200, repeat=5):
+    registry = FUNCTIONS.copy()
+    registry.register('secret', secret, arity=(1, 2), context=True)
+    ast = Parser(lex(generate(categories))).parse()
+    
+    def full(env):
+        interpreter = TrackingInterpreter(environ=env, functions=registry)
+        interpreter.eval(ast)
+        return interpreter
+    
+    failed = []
+    interpreter = full(environ(categories))
+    elapsed = best(lambda: full(environ(categories)), repeat)
+    print(f'{categories} categories, {categories * 20} items')
+    print(f'full evaluation:            {elapsed * 1000:9.2f} ms')
+    
+    # Changing one variable must reach its category, whichever way it was
+    # read, and update() must agree with evaluating from scratch.
+    for changed, kind, name in ((0, 'secret()', 'SECRET_0'), (1, 'env()', 'ZOV_BENCH_1')):
+        paths = interpreter.update(environ=environ(categories, changed))
+        reached = interpreter.dependents(environ=[name])
+        status = 'ok' if paths and paths == reached and interpreter.to_dict() == full(environ(categories, changed)).to_dict() else 'MISSED'
+        if status != 'ok':
+            failed.append(kind)
+        # Switched back and forth, so every timed update has work to do.
+        before, after = environ(categories), environ(categories, changed)
+        elapsed = best(lambda: (interpreter.update(environ=before), interpreter.update(environ=after)), repeat) / 2
+        print(f'update, one {kind:10}      {elapsed * 1000:9.2f} ms ({len(paths)} items)  {status}')
+        interpreter.update(environ=before)
+    
+    if failed:
+        print(f'\nuntracked environment reads: {", ".join(failed)}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
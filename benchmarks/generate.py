@@ -0,0 +1,79 @@
+import os
+import random
+
+
+def generate_literal(rng):
+    kind = rng.randrange(4)
+    if kind == 0:
+        return str(rng.randrange(100000))
+    elif kind == 1:
+        return f'"value-{rng.randrange(1000)}"'
+    elif kind == 2:
+        return f'{rng.randrange(1, 600)}s'
+    return f'{rng.randrange(1, 512)}MB'
+
+
+def generate_expression(rng):
+    kind = rng.randrange(3)
+    if kind == 0:
+        return f'$BASE + {rng.randrange(100)}'
+    elif kind == 1:
+        return f'($BASE * {rng.randrange(1, 10)}) % {rng.randrange(2, 50)}'
+    return f'concat($NAME, "-", {rng.randrange(100)})'
+
+
+def generate_interpolation(rng, i):
+    if rng.randrange(2):
+        return f'"item {i} in $NAME"'
+    return f'"${{$BASE + {rng.randrange(100)}}} for $NAME"'
+
+
+def generate_value(rng, i, expressions, interpolations):
+    roll = rng.random()
+    if roll < expressions:
+        return generate_expression(rng)
+    if roll < expressions + interpolations:
+        return generate_interpolation(rng, i)
+    return generate_literal(rng)
+
+
+def generate_category(rng, name, depth, items, indent=0, list_length=1, expressions=1 / 6, interpolations=1 / 6):
+    pad = '    ' * indent
+    lines = [f'{pad}{name} {{']
+    for i in range(items):
+        values = ', '.join(generate_value(rng, i, expressions, interpolations) for _ in range(rng.randint(1, list_length)))
+        lines.append(f'{pad}    key_{i} = {values};')
+    if depth > 0:
+        for j in range(2):
+            lines.extend(generate_category(rng, f'{name}_{j}', depth - 1, items, indent + 1, list_length, expressions, interpolations))
+    lines.append(f'{pad}}}')
+    return lines
+
+
+def generate_source(categories=50, depth=2, items=10, seed=0, list_length=1, expressions=1 / 6, interpolations=1 / 6):
+    rng = random.Random(seed)
+    lines = ['$BASE = 100;', '$NAME = "bench";']
+    for c in range(categories):
+        lines.extend(generate_category(rng, f'Category_{c}', depth, items, 0, list_length, expressions, interpolations))
+    return '\n'.join(lines) + '\n'
+
+
+def generate_tree(directory, files=20, categories=20, depth=2, items=10, seed=0, fanout=None, **options):
+    # Without a fanout every part is included from main.zov; with one, main.zov
+    # and each part include the next `fanout` parts, breadth first.
+    os.makedirs(directory, exist_ok=True)
+    children = {n: [] for n in range(-1, files)}
+    for n in range(files):
+        parent = -1 if fanout is None else n // fanout - 1
+        children[parent].append(n)
+    
+    for n in range(files):
+        includes = [f'include "part_{child}.zov";' for child in children[n]]
+        source = generate_source(categories, depth, items, seed + n, **options).replace('Category_', f'Part{n}_')
+        with open(os.path.join(directory, f'part_{n}.zov'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(includes + [source]))
+    
+    root = os.path.join(directory, 'main.zov')
+    with open(root, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(f'include "part_{child}.zov";' for child in children[-1]) + '\n')
+    return root
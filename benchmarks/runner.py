@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zov import lex, Parser, ZovInterpreter, parse_file
+from benchmarks.generate import generate_source, generate_tree
+
+PHASES = ['lex', 'parse', 'eval', 'to_dict', 'json', 'include']
+
+
+def measure(func, repeat, memory=True):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(args):
+    knobs = {'list_length': args.list_length, 'expressions': args.expressions, 'interpolations': args.interpolations}
+    code = generate_source(args.categories, args.depth, args.items, args.seed, **knobs)
+    size = len(code.encode('utf-8'))
+    
+    tokens = list(lex(code))
+    document = Parser(tokens).parse()
+    interpreter = ZovInterpreter()
+    interpreter.eval(document)
+    data = interpreter.to_dict()
+    
+    def evaluate():
+        ZovInterpreter().eval(document)
+    
+    steps = {
+        'lex': (lambda: list(lex(code)), size),
+        'parse': (lambda: Parser(tokens).parse(), size),
+        'eval': (evaluate, size),
+        'to_dict': (interpreter.to_dict, size),
+        'json': (lambda: json.dumps(data, ensure_ascii=False), size),
+    }
+    
+    results = {}
+    for phase, (func, phase_size) in steps.items():
+        elapsed, peak = measure(func, args.repeat, not args.no_memory)
+        results[phase] = {'seconds': elapsed, 'mb_per_s': phase_size / elapsed / 1e6, 'peak_mb': peak / 1e6 if peak is not None else None}
+    
+    if args.files:
+        workdir = tempfile.mkdtemp(prefix='zov-bench-')
+        try:
+            root = generate_tree(workdir, args.files, args.categories, args.depth, args.items, args.seed, args.fanout, **knobs)
+            tree_size = sum(os.path.getsize(os.path.join(workdir, name)) for name in os.listdir(workdir))
+            elapsed, peak = measure(lambda: parse_file(root), args.repeat, not args.no_memory)
+            results['include'] = {'seconds': elapsed, 'mb_per_s': tree_size / elapsed / 1e6, 'peak_mb': peak / 1e6 if peak is not None else None}
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    config = dict(knobs, categories=args.categories, depth=args.depth, items=args.items, files=args.files, fanout=args.fanout, seed=args.seed)
+    return {'config': config, 'source_mb': size / 1e6, 'tokens': len(tokens), 'phases': results}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for phase in PHASES:
+        if phase not in results['phases'] or phase not in baseline['phases']:
+            continue
+        # Throughput rather than time, so a baseline from another size still compares.
+        before = baseline['phases'][phase]['mb_per_s']
+        after = results['phases'][phase]['mb_per_s']
+        change = before / after - 1
+        results['phases'][phase]['change'] = change
+        if change > threshold:
+            regressions.append(phase)
+    return regressions
+
+
+def report(results):
+    print(f"source: {results['source_mb']:.2f} MB, {results['tokens']} tokens")
+    print(f"{'phase':<9} {'time':>11} {'MB/s':>8} {'peak':>10} {'vs base':>9}")
+    for phase in PHASES:
+        if phase not in results['phases']:
+            continue
+        entry = results['phases'][phase]
+        peak = f"{entry['peak_mb']:7.2f} MB" if entry['peak_mb'] is not None else ''
+        change = f"{entry['change'] * 100:+8.1f}%" if 'change' in entry else ''
+        print(f"{phase:<9} {entry['seconds'] * 1000:8.2f} ms {entry['mb_per_s']:8.2f} {peak:>10} {change:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time each ZOV phase on a generated document')
+    parser.add_argument('--categories', type=int, default=200, help='Top-level categories')
+    parser.add_argument('--depth', type=int, default=2, help='Nesting depth below each category')
+    parser.add_argument('--items', type=int, default=10, help='Items per category')
+    parser.add_argument('--list-length', type=int, default=1, help='Maximum values per item')
+    parser.add_argument('--expressions', type=float, default=1 / 6, help='Share of values that are expressions or function calls')
+    parser.add_argument('--interpolations', type=float, default=1 / 6, help='Share of values that are interpolated strings')
+    parser.add_argument('--files', type=int, default=0, help='Also time parse_file on an include tree of this many files')
+    parser.add_argument('--fanout', type=int, help='Includes per file in the tree (default: all from the root)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per phase; the best is reported')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak-memory run')
+    parser.add_argument('--save', help='Write the results as JSON to this baseline file')
+    parser.add_argument('--compare', help='Compare against a baseline written by --save')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Slowdown that counts as a regression (default: 0.1)')
+    args = parser.parse_args(argv)
+    
+    results = run(args)
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('config') != results['config']:
+            print(f"Warning: baseline was generated with {baseline.get('config')}")
+        regressions = compare(results, baseline, args.threshold)
+    report(results)
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(f"Regressions over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,19 @@
+import os
 import sys
 import json
+import time
+import signal
 import argparse
-from zov import load_zov, parse_file
-from zov.ast import ZovDocument, ZovCategory, ZovItem
+from concurrent.futures import ProcessPoolExecutor
+from zov import load_zov, load_interpreter, parse_file, ZovOptimizer, LoadStats, write_json, write_binary, write_snapshot
+from zov import ConfigServer, load_zov_remote, select_paths, ReloadableConfig
+from zov.stats import timed
+from zov.output import temp_output
+from zov.ast import ZovDocument, ZovCategory, ZovItem, ZovValue
+
+
+JSON_INDENT = {'json': 2, 'compact': None}
+EXTENSIONS = {'json': '.json', 'compact': '.json', 'binary': '.zovb', 'snapshot': '.zovs'}
 
 
 def print_ast(node, indent=0):
@@ -20,9 +31,8 @@ def print_ast(node, indent=0):
     elif isinstance(node, ZovItem):
         formatted_values = []
         for v in node.values:
-            if isinstance(v, dict) and '__type__' in v:
-                if v['__type__'] == 'identifier':
-                    formatted_values.append(v['value'])
+            if isinstance(v, ZovValue):
+                formatted_values.append(str(v.simplify()))
             elif isinstance(v, str) and (' ' in v or any(c in v for c in ',.;{}="')):
                 formatted_values.append(f'"{v}"')
             elif isinstance(v, bool):
@@ -67,53 +77,273 @@ def format_error(error, filename):
     return None
 
 
+def report_error(error, filename):
+    if isinstance(error, FileNotFoundError):
+        return f"\n❌ File Error: {error}\n"
+    if isinstance(error, SyntaxError):
+        kind = 'Syntax Error'
+    elif isinstance(error, ValueError):
+        kind = 'Logic Error'
+    else:
+        return f"\n❌ Unexpected Error: {error}\n"
+    
+    lines = [f"\n❌ {kind} in '{filename}':", f"   {error}\n"]
+    context = format_error(error, filename)
+    if context:
+        lines.extend([context, ""])
+    return '\n'.join(lines)
+
+
+def write_output(data, output_format, stream):
+    if output_format == 'binary':
+        write_binary(data, stream)
+    else:
+        write_json(data, stream, JSON_INDENT[output_format])
+
+
+def save_output(data, output_format, filename):
+    if output_format == 'snapshot':
+        write_snapshot(data, filename)
+        return
+    fd, tmp_path, target = temp_output(filename)
+    try:
+        if output_format == 'binary':
+            with os.fdopen(fd, 'wb') as f:
+                write_output(data, output_format, f)
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                write_output(data, output_format, f)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def batch_inputs(paths, output_dir=None, extension='.json'):
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith('.zov'):
+                        filename = os.path.join(root, name)
+                        inputs.append((filename, os.path.relpath(filename, path)))
+        else:
+            inputs.append((path, os.path.basename(path)))
+    
+    if output_dir is None:
+        return [(filename, None) for filename, _ in inputs]
+    return [(filename, os.path.join(output_dir, os.path.splitext(name)[0] + extension)) for filename, name in inputs]
+
+
+def batch_load(job):
+    filename, target, output_format, options = job
+    start = time.perf_counter()
+    try:
+        data = load_zov(filename, **options)
+        if target is None:
+            output = json.dumps({'file': filename, 'data': data}, ensure_ascii=False)
+        else:
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            save_output(data, output_format, target)
+            output = None
+        error = None
+    except Exception as e:
+        output = json.dumps({'file': filename, 'error': str(e)}, ensure_ascii=False) if target is None else None
+        error = report_error(e, filename)
+    return filename, output, error, time.perf_counter() - start
+
+
+def run_batch(args):
+    options = {'use_decimal': args.decimal, 'cache_dir': args.cache_dir, 'optimize': args.optimize, 'select': args.select,
+               'workers': args.include_workers, 'processes': args.include_processes}
+    inputs = batch_inputs(args.batch, args.output_dir, EXTENSIONS[args.format])
+    jobs = [(filename, target, args.format, options) for filename, target in inputs]
+    workers = args.jobs or os.cpu_count() or 1
+    
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) < 2:
+        results = map(batch_load, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(batch_load, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+    
+    failed = 0
+    busy = 0.0
+    try:
+        for filename, output, error, elapsed in results:
+            busy += elapsed
+            if output is not None:
+                print(output)
+            if error is not None:
+                failed += 1
+                print(error, file=sys.stderr)
+            print(f"{elapsed * 1000:9.2f} ms  {filename}", file=sys.stderr)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    wall = time.perf_counter() - start
+    average = busy / len(jobs) * 1000 if jobs else 0.0
+    print(f"{len(jobs)} files, {failed} failed in {wall:.2f} s (-j {workers}, {average:.2f} ms per file)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run(args, stats=None):
+    if args.ast:
+        ast = parse_file(args.file, cache_dir=args.cache_dir, workers=args.include_workers, processes=args.include_processes, stats=stats)
+        if args.optimize:
+            optimizer = ZovOptimizer(use_decimal=args.decimal)
+            ast = optimizer.optimize(ast)
+            print(f"Eliminated {optimizer.eliminated} nodes", file=sys.stderr)
+        print_ast(ast)
+        return
+    
+    options = {'use_decimal': args.decimal, 'cache_dir': args.cache_dir, 'optimize': args.optimize, 'select': args.select,
+               'workers': args.include_workers, 'processes': args.include_processes, 'stats': stats}
+    if args.socket:
+        data = load_zov_remote(args.file, use_decimal=args.decimal, optimize=args.optimize, socket_path=args.socket)
+        if args.select:
+            data = select_paths(data, args.select)
+    elif args.select:
+        data = load_zov(args.file, **options)
+    else:
+        data = load_interpreter(args.file, **options).view()
+    emit(data, args, stats)
+
+
+def emit(data, args, stats=None):
+    if args.output:
+        timed(stats, 'write', save_output, data, args.format, args.output)
+        print(f"✓ Saved to {args.output}")
+    elif args.format == 'binary':
+        sys.stdout.flush()
+        timed(stats, 'write', write_output, data, args.format, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    else:
+        timed(stats, 'write', write_output, data, args.format, sys.stdout)
+        print()
+    sys.stdout.flush()
+
+
+def run_watch(args):
+    # Reloads on every change to the file or its includes and writes the
+    # result again; an edit re-parses only the statements it touched.
+    config = None
+    while config is None:
+        try:
+            config = ReloadableConfig(args.file, use_decimal=args.decimal)
+        except Exception as e:
+            print(report_error(e, args.file), file=sys.stderr)
+            time.sleep(args.interval)
+    
+    changed = True
+    error = None
+    while True:
+        if changed:
+            data = config.to_dict()
+            emit(select_paths(data, args.select) if args.select else data, args)
+        time.sleep(args.interval)
+        start = time.perf_counter()
+        try:
+            changed = config.poll()
+        except Exception as e:
+            # Reported once; the file is polled again until it loads.
+            if str(e) != error:
+                error = str(e)
+                print(report_error(e, args.file), file=sys.stderr)
+            changed = []
+            continue
+        error = None
+        if changed:
+            print(f"↻ {len(changed)} changed in {(time.perf_counter() - start) * 1000:.2f} ms: {', '.join(changed[:5])}"
+                  f"{' ...' if len(changed) > 5 else ''}", file=sys.stderr)
+
+
+def print_profile(profiler, target):
+    if target != '-':
+        profiler.dump_stats(target)
+        print(f"Profile written to {target}", file=sys.stderr)
+        return
+    import pstats
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(30)
+
+
 def main():
     parser = argparse.ArgumentParser(description='ZOV Language CLI')
-    parser.add_argument('file', help='ZOV file to process')
+    parser.add_argument('file', nargs='?', help='ZOV file to process')
     parser.add_argument('--ast', action='store_true', help='Print AST tree')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
     parser.add_argument('--output', '-o', help='Output file')
+    parser.add_argument('--format', choices=['json', 'compact', 'binary', 'snapshot'], default='json', help='Output format: indented JSON, compact JSON, ZOV binary or an mmap-able snapshot')
     parser.add_argument('--decimal', action='store_true', help='Use Decimal for precise calculations')
+    parser.add_argument('--cache-dir', help='Directory for the compiled AST cache')
+    parser.add_argument('--optimize', action='store_true', help='Fold constant expressions before evaluation')
+    parser.add_argument('--select', action='append', help='Only evaluate this dotted category or item path (repeatable)')
+    parser.add_argument('--include-workers', type=int, help='Read include files ahead with this many threads')
+    parser.add_argument('--include-processes', action='store_true', help='With --include-workers, also parse includes, and large files in pieces, in worker processes')
+    parser.add_argument('--batch', nargs='+', metavar='PATH', help='Evaluate many files or directories of .zov files in parallel')
+    parser.add_argument('--jobs', '-j', type=int, help='Worker processes for --batch (default: CPU count)')
+    parser.add_argument('--stats', action='store_true', help='Print per-phase timings and counters to stderr')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE', help='Run under cProfile; print the report or save it to FILE')
+    parser.add_argument('--daemon', action='store_true', help='Serve evaluated configs over a Unix socket until interrupted')
+    parser.add_argument('--socket', help='Unix socket of the daemon: where --daemon listens, or where to fetch FILE from')
+    parser.add_argument('--output-dir', help='With --batch, write one JSON file per input instead of NDJSON to stdout')
+    parser.add_argument('--watch', action='store_true', help='Write the result again whenever FILE or its includes change')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between checks for --watch (default: 0.5)')
     
     args = parser.parse_args()
     
-    try:
-        if args.ast:
-            ast = parse_file(args.file)
-            print_ast(ast)
-        else:
-            data = load_zov(args.file, use_decimal=args.decimal)
-            output = json.dumps(data, indent=2, ensure_ascii=False)
-            
-            if args.output:
-                with open(args.output, 'w', encoding='utf-8') as f:
-                    f.write(output)
-                print(f"✓ Saved to {args.output}")
-            else:
-                print(output)
+    if args.format == 'snapshot' and not (args.output_dir if args.batch else args.output or args.ast):
+        parser.error('--format snapshot needs an output file (-o, or --output-dir with --batch)')
+    if args.daemon:
+        server = ConfigServer(args.socket, cache_dir=args.cache_dir, workers=args.include_workers)
+        print(f"Serving on {server.socket_path}", file=sys.stderr)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"\n❌ Daemon Error: {e}\n", file=sys.stderr)
+            sys.exit(1)
+        return
+    if args.batch:
+        if args.stats or args.profile:
+            parser.error('--stats and --profile apply to a single file, not --batch')
+        sys.exit(run_batch(args))
+    if not args.file:
+        parser.error('the following arguments are required: file')
+    if args.watch:
+        if args.ast or args.socket or args.stats or args.profile:
+            parser.error('--watch cannot be combined with --ast, --socket, --stats or --profile')
+        try:
+            run_watch(args)
+        except KeyboardInterrupt:
+            pass
+        return
     
-    except FileNotFoundError as e:
-        print(f"\n❌ File Error: {e}\n", file=sys.stderr)
-        sys.exit(1)
-    except SyntaxError as e:
-        print(f"\n❌ Syntax Error in '{args.file}':", file=sys.stderr)
-        print(f"   {e}\n", file=sys.stderr)
-        context = format_error(e, args.file)
-        if context:
-            print(context, file=sys.stderr)
-            print("", file=sys.stderr)
-        sys.exit(1)
-    except ValueError as e:
-        print(f"\n❌ Logic Error in '{args.file}':", file=sys.stderr)
-        print(f"   {e}\n", file=sys.stderr)
-        context = format_error(e, args.file)
-        if context:
-            print(context, file=sys.stderr)
-            print("", file=sys.stderr)
-        sys.exit(1)
+    stats = LoadStats() if args.stats else None
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    try:
+        run(args, stats)
     except Exception as e:
-        print(f"\n❌ Unexpected Error: {e}\n", file=sys.stderr)
+        print(report_error(e, args.file), file=sys.stderr)
         sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            print_profile(profiler, args.profile)
+        if stats is not None:
+            print(stats.report(), file=sys.stderr)
 
 
 if __name__ == '__main__':
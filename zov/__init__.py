@@ -1,26 +1,84 @@
 import os
-from .lexer import lex
-from .parser import Parser
+from .lexer import lex, lex_file
+from .parser import Parser, IncludeCache
 from .interpreter import ZovInterpreter
+from .cache import AstCache, read_source, is_fresh
+from .optimizer import ZovOptimizer
+from .compiler import ZovCompiler, CompiledDocument, compile_document
+from .lazy import LazyConfig, select_paths
+from .stats import LoadStats, timed
+from .query import compile_pattern
+from .output import write_json, write_binary, dumps_binary, loads_binary, read_binary
+from .snapshot import Snapshot, write_snapshot
+from .daemon import ConfigServer, ConfigClient, load_zov_remote
+from .aio import load_zov_async, load_many_async
+from .reload import ReloadableConfig
+from .tracking import TrackingInterpreter
+from .incremental import IncrementalDocument
+from .functions import FunctionRegistry, FUNCTIONS, register_function
 from .ast import ZovDocument, ZovCategory, ZovItem, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString
+from .ast import Duration, Size, Date, DateTime, Time, VariableRef, Identifier
 
 __version__ = "1.0.0"
-__all__ = ['lex', 'Parser', 'ZovInterpreter', 'ZovDocument', 'ZovCategory', 'ZovItem', 'ZovVariable', 'ZovExpression', 'ZovFunctionCall', 'ZovInterpolatedString']
+__all__ = ['lex', 'lex_file', 'Parser', 'ZovInterpreter', 'ZovDocument', 'ZovCategory', 'ZovItem', 'ZovVariable', 'ZovExpression', 'ZovFunctionCall', 'ZovInterpolatedString', 'AstCache', 'IncludeCache', 'ZovOptimizer', 'ZovCompiler', 'CompiledDocument', 'compile_document', 'LazyConfig', 'select_paths', 'LoadStats', 'compile_pattern', 'load_interpreter', 'write_json', 'write_binary', 'dumps_binary', 'loads_binary', 'read_binary', 'Snapshot', 'write_snapshot', 'ConfigServer', 'ConfigClient', 'load_zov_remote', 'load_zov_async', 'load_many_async', 'ReloadableConfig', 'TrackingInterpreter', 'IncrementalDocument', 'FunctionRegistry', 'FUNCTIONS', 'register_function', 'Duration', 'Size', 'Date', 'DateTime', 'Time', 'VariableRef', 'Identifier']
 
+compile = compile_document
 
-def parse_file(filename):
-    abs_path = os.path.abspath(filename)
-    base_path = os.path.dirname(abs_path)
+
+def parse_file(filename, cache_dir=None, select=None, workers=None, processes=False, stats=None, dependencies=None):
+    ast = timed(stats, 'parse', _parse_file, os.path.abspath(filename), cache_dir, select, workers, processes, stats, dependencies)
+    if stats is not None:
+        stats.count_nodes(ast)
+    return ast
+
+
+def _parse_file(abs_path, cache_dir, select, workers, processes, stats, tracked=None, sources=None):
+    # tracked, when given, receives the fingerprint of every file read;
+    # sources holds files the caller has already read.
+    cache = AstCache(cache_dir) if cache_dir is not None and not select else None
+    includes = IncludeCache(workers, processes, tracked is not None, sources)
+    
+    try:
+        if cache is not None:
+            cached = cache.get(abs_path, includes.stat)
+            if cached is not None:
+                if tracked is not None:
+                    tracked.update(cached[1])
+                return cached[0]
+        
+        fingerprints = {} if cache is not None or tracked is not None else None
+        includes.prefetch(abs_path)
+        parser = Parser((), os.path.dirname(abs_path), None, cache, includes, select, None, stats)
+        ast, dependencies = parser.load_file(abs_path, fingerprints, {abs_path})
+    finally:
+        includes.close()
     
-    with open(abs_path, 'r', encoding='utf-8') as f:
-        code = f.read()
-    tokens = lex(code)
-    parser = Parser(tokens, base_path, {abs_path})
-    return parser.parse()
-
-
-def load_zov(filename, use_decimal=False):
-    ast = parse_file(filename)
-    interpreter = ZovInterpreter(use_decimal=use_decimal)
-    interpreter.eval(ast)
-    return interpreter.to_dict()
+    if fingerprints is not None:
+        dependencies.update(fingerprints)
+    if cache is not None:
+        cache.put(abs_path, ast, dependencies)
+    if tracked is not None:
+        tracked.update(dependencies)
+    return ast
+
+
+def load_interpreter(filename, use_decimal=False, cache_dir=None, optimize=False, select=None, workers=None, processes=False, stats=None, dependencies=None, functions=None, environ=None):
+    ast = parse_file(filename, cache_dir=cache_dir, select=select, workers=workers, processes=processes, stats=stats, dependencies=dependencies)
+    if optimize:
+        ast = timed(stats, 'optimize', ZovOptimizer(use_decimal=use_decimal, functions=functions).optimize, ast)
+    interpreter = ZovInterpreter(use_decimal=use_decimal, environ=environ, stats=stats, functions=functions)
+    timed(stats, 'eval', interpreter.eval, ast)
+    return interpreter
+
+
+def load_zov(filename, use_decimal=False, cache_dir=None, optimize=False, lazy=False, select=None, workers=None, processes=False, stats=None, functions=None, environ=None):
+    if lazy:
+        ast = parse_file(filename, cache_dir=cache_dir, select=select, workers=workers, processes=processes, stats=stats)
+        if optimize:
+            ast = timed(stats, 'optimize', ZovOptimizer(use_decimal=use_decimal, functions=functions).optimize, ast)
+        return LazyConfig(ast, use_decimal=use_decimal, environ=environ, select=select, functions=functions)
+    interpreter = load_interpreter(filename, use_decimal, cache_dir, optimize, select, workers, processes, stats, functions=functions, environ=environ)
+    data = timed(stats, 'to_dict', interpreter.to_dict)
+    if select:
+        return select_paths(data, select)
+    return data
@@ -0,0 +1,85 @@
+import os
+import asyncio
+from functools import partial
+try:
+    from .cache import read_source
+    from .parser import INCLUDE_REGEX
+except ImportError:
+    import cache as cache_module
+    import parser as parser_module
+    read_source = cache_module.read_source
+    INCLUDE_REGEX = parser_module.INCLUDE_REGEX
+
+
+def _read(path):
+    fingerprints = {}
+    try:
+        code = read_source(path, fingerprints)
+    except (OSError, UnicodeDecodeError):
+        # Left to the parser, which reports it with the include position.
+        return None
+    return code, fingerprints[path]
+
+
+async def read_sources(filename):
+    # Reads the file and everything it includes on worker threads, one
+    # level of the include tree at a time.
+    loop = asyncio.get_running_loop()
+    path = os.path.abspath(filename)
+    sources = {}
+    seen = {path}
+    pending = [path]
+    while pending:
+        results = await asyncio.gather(*(loop.run_in_executor(None, _read, p) for p in pending))
+        level, pending = pending, []
+        for p, source in zip(level, results):
+            if source is None:
+                continue
+            sources[p] = source
+            # Same rule as IncludeCache.prefetch: only files inside the
+            # including file's directory can pass the traversal check.
+            base_path = os.path.dirname(p)
+            for name in INCLUDE_REGEX.findall(source[0]):
+                included = os.path.abspath(os.path.join(base_path, name))
+                if included.startswith(base_path + os.sep) and included not in seen:
+                    seen.add(included)
+                    pending.append(included)
+    return sources
+
+
+def _load(abs_path, sources, use_decimal, cache_dir, optimize, select, functions, environ, stats):
+    from . import _parse_file, ZovOptimizer, ZovInterpreter, select_paths, timed
+    ast = timed(stats, 'parse', _parse_file, abs_path, cache_dir, select, None, False, stats, None, sources)
+    if stats is not None:
+        stats.count_nodes(ast)
+    if optimize:
+        ast = timed(stats, 'optimize', ZovOptimizer(use_decimal=use_decimal, functions=functions).optimize, ast)
+    interpreter = ZovInterpreter(use_decimal=use_decimal, environ=environ, stats=stats, functions=functions)
+    timed(stats, 'eval', interpreter.eval, ast)
+    data = timed(stats, 'to_dict', interpreter.to_dict)
+    if select:
+        return select_paths(data, select)
+    return data
+
+
+async def load_zov_async(filename, use_decimal=False, cache_dir=None, optimize=False, select=None, executor=None,
+                         functions=None, environ=None, stats=None):
+    # Parsing and evaluation run in executor (the loop's default thread
+    # pool when None); pass a ProcessPoolExecutor to keep them off the
+    # event loop's interpreter entirely. A process pool works on copies,
+    # so stats are only filled in by a thread pool.
+    abs_path = os.path.abspath(filename)
+    sources = await read_sources(abs_path)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(_load, abs_path, sources, use_decimal, cache_dir, optimize,
+                                                        tuple(select) if select else None, functions, environ, stats))
+
+
+async def load_many_async(filenames, limit=8, return_exceptions=False, **options):
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def load(filename):
+        async with semaphore:
+            return await load_zov_async(filename, **options)
+    
+    return await asyncio.gather(*(load(filename) for filename in filenames), return_exceptions=return_exceptions)
@@ -1,4 +1,81 @@
-class ZovCategory:
+from collections import namedtuple
+
+
+class ZovValue:
+    __slots__ = ()
+    kind = None
+    
+    def simplify(self):
+        return self.value
+    
+    def to_dict(self):
+        return {'__type__': self.kind, **self._asdict()}
+    
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple.__eq__(self, other)
+    
+    def __ne__(self, other):
+        return not self == other
+    
+    __hash__ = tuple.__hash__
+
+
+class Duration(ZovValue, namedtuple('Duration', ['value', 'unit'])):
+    __slots__ = ()
+    kind = 'duration'
+    
+    def simplify(self):
+        return f'{self.value}{self.unit}'
+
+
+class Size(ZovValue, namedtuple('Size', ['value', 'unit'])):
+    __slots__ = ()
+    kind = 'size'
+    
+    def simplify(self):
+        return f'{self.value}{self.unit}'
+
+
+class Date(ZovValue, namedtuple('Date', ['value'])):
+    __slots__ = ()
+    kind = 'date'
+
+
+class DateTime(ZovValue, namedtuple('DateTime', ['value'])):
+    __slots__ = ()
+    kind = 'datetime'
+
+
+class Time(ZovValue, namedtuple('Time', ['value'])):
+    __slots__ = ()
+    kind = 'time'
+
+
+class VariableRef(ZovValue, namedtuple('VariableRef', ['name'])):
+    __slots__ = ()
+    kind = 'variable_ref'
+    
+    def simplify(self):
+        return self.name
+
+
+class Identifier(ZovValue, namedtuple('Identifier', ['value'])):
+    __slots__ = ()
+    kind = 'identifier'
+
+
+class ZovNode:
+    __slots__ = ()
+    
+    # Slotted objects otherwise unpickle through setattr per slot, which
+    # makes loading a cached AST several times slower.
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+
+class ZovCategory(ZovNode):
+    __slots__ = ('name', 'items', 'line', 'column')
+    
     def __init__(self, name, items, line=None, column=None):
         self.name = name
         self.items = items
@@ -9,7 +86,9 @@ class ZovCategory:
         return f'ZovCategory({self.name}, {self.items})'
 
 
-class ZovItem:
+class ZovItem(ZovNode):
+    __slots__ = ('name', 'values', 'line', 'column')
+    
     def __init__(self, name, values, line=None, column=None):
         self.name = name
         self.values = values
@@ -20,7 +99,9 @@ class ZovItem:
         return f'ZovItem({self.name}, {self.values})'
 
 
-class ZovDocument:
+class ZovDocument(ZovNode):
+    __slots__ = ('categories',)
+    
     def __init__(self, categories):
         self.categories = categories
     
@@ -28,7 +109,9 @@ class ZovDocument:
         return f'ZovDocument({self.categories})'
 
 
-class ZovInclude:
+class ZovInclude(ZovNode):
+    __slots__ = ('filename', 'line', 'column')
+    
     def __init__(self, filename, line=None, column=None):
         self.filename = filename
         self.line = line
@@ -38,7 +121,9 @@ class ZovInclude:
         return f'ZovInclude({self.filename})'
 
 
-class ZovVariable:
+class ZovVariable(ZovNode):
+    __slots__ = ('name', 'value', 'line', 'column')
+    
     def __init__(self, name, value, line=None, column=None):
         self.name = name
         self.value = value
@@ -49,7 +134,9 @@ class ZovVariable:
         return f'ZovVariable({self.name}, {self.value})'
 
 
-class ZovExpression:
+class ZovExpression(ZovNode):
+    __slots__ = ('operator', 'left', 'right', 'line', 'column')
+    
     def __init__(self, operator, left, right, line=None, column=None):
         self.operator = operator
         self.left = left
@@ -61,7 +148,9 @@ class ZovExpression:
         return f'ZovExpression({self.operator}, {self.left}, {self.right})'
 
 
-class ZovFunctionCall:
+class ZovFunctionCall(ZovNode):
+    __slots__ = ('name', 'args', 'line', 'column')
+    
     def __init__(self, name, args, line=None, column=None):
         self.name = name
         self.args = args
@@ -72,7 +161,9 @@ class ZovFunctionCall:
         return f'ZovFunctionCall({self.name}, {self.args})'
 
 
-class ZovInterpolatedString:
+class ZovInterpolatedString(ZovNode):
+    __slots__ = ('parts', 'line', 'column')
+    
     def __init__(self, parts, line=None, column=None):
         self.parts = parts
         self.line = line
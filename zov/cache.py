@@ -0,0 +1,104 @@
+import os
+import pickle
+import hashlib
+import tempfile
+
+CACHE_VERSION = 3
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'zov')
+
+
+def read_source(path, fingerprints=None):
+    if fingerprints is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    st = os.stat(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        code = f.read()
+    fingerprints[path] = (st.st_mtime_ns, st.st_size, _digest(code))
+    return code
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _digest(code):
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+def is_fresh(dependencies, stat=None):
+    stat = stat or _stat
+    for path, fingerprint in dependencies.items():
+        if fingerprint is None:
+            return False
+        mtime_ns, size, digest = fingerprint
+        st = stat(path)
+        if st is None:
+            return False
+        if st.st_size != size:
+            return False
+        if st.st_mtime_ns != mtime_ns:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    if _digest(f.read()) != digest:
+                        return False
+            except (OSError, UnicodeDecodeError):
+                return False
+    return True
+
+
+class AstCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.abspath(cache_dir or default_cache_dir())
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+    
+    def _entry_path(self, abs_path):
+        key = hashlib.sha256(abs_path.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.zovc')
+    
+    def get(self, abs_path, stat=None):
+        try:
+            with open(self._entry_path(abs_path), 'rb') as f:
+                entry = pickle.load(f)
+        except Exception:
+            self.misses += 1
+            return None
+        
+        if (not isinstance(entry, dict)
+                or entry.get('version') != CACHE_VERSION
+                or entry.get('path') != abs_path
+                or not is_fresh(entry['dependencies'], stat)):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return entry['document'], entry['dependencies']
+    
+    def put(self, abs_path, document, dependencies):
+        entry = {
+            'version': CACHE_VERSION,
+            'path': abs_path,
+            'dependencies': dict(dependencies),
+            'document': document,
+        }
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self._entry_path(abs_path))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, pickle.PicklingError, RecursionError):
+            pass
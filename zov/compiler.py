@@ -0,0 +1,215 @@
+try:
+    from .ast import ZovDocument, ZovCategory, ZovItem, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString, VariableRef
+    from .interpreter import ZovInterpreter
+except ImportError:
+    import ast as ast_module
+    import interpreter as interpreter_module
+    ZovDocument = ast_module.ZovDocument
+    ZovCategory = ast_module.ZovCategory
+    ZovItem = ast_module.ZovItem
+    ZovVariable = ast_module.ZovVariable
+    ZovExpression = ast_module.ZovExpression
+    ZovFunctionCall = ast_module.ZovFunctionCall
+    ZovInterpolatedString = ast_module.ZovInterpolatedString
+    VariableRef = ast_module.VariableRef
+    ZovInterpreter = interpreter_module.ZovInterpreter
+
+
+class CompiledDocument:
+    def __init__(self, steps, build, slots, use_decimal=False, functions=None):
+        self.steps = steps
+        self.build = build
+        self.slots = slots
+        self.use_decimal = use_decimal
+        self.functions = functions
+    
+    def run(self, env=None, functions=None):
+        if functions is None:
+            functions = self.functions
+        interp = ZovInterpreter(use_decimal=self.use_decimal, environ=env, functions=functions)
+        slots = list(self.slots)
+        for step in self.steps:
+            step(interp, slots)
+        return self.build(slots)
+
+
+class ZovCompiler:
+    def __init__(self, use_decimal=False, functions=None):
+        self.use_decimal = use_decimal
+        self.functions = functions
+        self.steps = []
+        self.data = {}
+        self.slots = []
+        self._interpreter = ZovInterpreter(use_decimal=use_decimal, functions=functions)
+    
+    def compile(self, document):
+        self.compile_node(document)
+        layout, error = self._layout()
+        if error is not None:
+            self.steps.append(_raise(error))
+        return CompiledDocument(self.steps, _compile_build(layout), self.slots, self.use_decimal, self.functions)
+    
+    def compile_node(self, node, parent_path=None):
+        if isinstance(node, ZovDocument):
+            for item in node.categories:
+                if isinstance(item, ZovVariable):
+                    self.compile_variable(item)
+                else:
+                    self.compile_node(item)
+        elif isinstance(node, ZovCategory):
+            path = f"{parent_path}.{node.name}" if parent_path else node.name
+            if path not in self.data:
+                self.data[path] = {'__items__': {}, '__categories__': set()}
+            
+            for item in node.items:
+                if isinstance(item, ZovVariable):
+                    self.compile_variable(item)
+                elif isinstance(item, ZovCategory):
+                    if item.name in self.data[path]['__items__']:
+                        line_info = f" at line {item.line}, column {item.column}" if item.line else ""
+                        self.steps.append(_raise(ValueError(f"Cannot create category '{item.name}': name already used as an item{line_info}")))
+                        return
+                    self.data[path]['__categories__'].add(item.name)
+                    self.compile_node(item, path)
+                elif isinstance(item, ZovItem):
+                    self.compile_item(item, path)
+    
+    def compile_variable(self, var_node):
+        name = var_node.name
+        value = self.compile_value(var_node.value)
+        
+        def step(interp, slots):
+            interp.variables[name] = value(interp)
+        self.steps.append(step)
+    
+    def compile_item(self, item, path):
+        line_info = f" at line {item.line}, column {item.column}" if item.line else ""
+        if item.name in self.data[path]['__items__']:
+            self.steps.append(_raise(ValueError(f"Duplicate item '{item.name}' in category '{path}'{line_info}")))
+            return
+        if item.name in self.data[path]['__categories__']:
+            self.steps.append(_raise(ValueError(f"Name collision: '{item.name}' is both a category and an item in '{path}'{line_info}")))
+            return
+        
+        slot = len(self.slots)
+        self.data[path]['__items__'][item.name] = slot
+        
+        if all(_is_literal(v) for v in item.values):
+            self.slots.append(tuple(self._interpreter._simplify_values(item.values)))
+            return
+        
+        self.slots.append(None)
+        values = [self.compile_value(v) for v in item.values]
+        
+        def step(interp, slots):
+            simplify = interp._simplify_value
+            slots[slot] = [simplify(value(interp)) for value in values]
+        self.steps.append(step)
+    
+    def compile_value(self, value):
+        if isinstance(value, ZovExpression):
+            node = value
+            left = self.compile_value(value.left)
+            right = self.compile_value(value.right)
+            return lambda interp: interp.operate(node, left(interp), right(interp))
+        
+        if isinstance(value, ZovFunctionCall):
+            node = value
+            args = [self.compile_value(arg) for arg in value.args]
+            return lambda interp: interp.call_function(node, [arg(interp) for arg in args])
+        
+        if isinstance(value, ZovInterpolatedString):
+            return self.compile_interpolated_string(value)
+        
+        if isinstance(value, VariableRef):
+            var_name = value.name
+            
+            def variable(interp):
+                if var_name not in interp.variables:
+                    raise ValueError(f"Undefined variable: {var_name}")
+                return interp.variables[var_name]
+            return variable
+        
+        return lambda interp: value
+    
+    def compile_interpolated_string(self, interp_str):
+        parts = []
+        for part_type, part_value in interp_str.parts:
+            if part_type == 'text':
+                text = part_value
+                parts.append(lambda interp, text=text: text)
+            elif part_type == 'var':
+                parts.append(_interpolated_variable(part_value, interp_str))
+            elif part_type == 'expr':
+                expr = self.compile_value(part_value)
+                parts.append(lambda interp, expr=expr: interp.interpolate(expr(interp)))
+        return lambda interp: ''.join([part(interp) for part in parts])
+    
+    def _layout(self):
+        layout = {}
+        
+        for path, content in sorted(self.data.items()):
+            parts = path.split('.')
+            current = layout
+            
+            for part in parts[:-1]:
+                if part not in current:
+                    current[part] = {}
+                elif not isinstance(current[part], dict):
+                    return None, ValueError(f"Cannot create nested structure: '{part}' is already a value, not a category")
+                current = current[part]
+            
+            final_key = parts[-1]
+            if final_key not in current:
+                current[final_key] = {}
+            elif not isinstance(current[final_key], dict):
+                return None, ValueError(f"Cannot create category '{final_key}': name already used as an item")
+            
+            for key, slot in content['__items__'].items():
+                current[final_key][key] = slot
+        
+        return layout, None
+
+
+def _is_literal(value):
+    return not isinstance(value, (ZovExpression, ZovFunctionCall, ZovInterpolatedString, VariableRef))
+
+
+def _raise(error):
+    def step(interp, slots):
+        raise error
+    return step
+
+
+def _interpolated_variable(var_name, interp_str):
+    def part(interp):
+        if var_name not in interp.variables:
+            raise ValueError(f"Undefined variable: {var_name} in interpolated string at line {interp_str.line}, column {interp_str.column}")
+        return str(interp._simplify_value(interp.variables[var_name]))
+    return part
+
+
+def _compile_build(layout):
+    if layout is None:
+        return lambda slots: None
+    
+    entries = []
+    for key, value in layout.items():
+        if isinstance(value, dict):
+            entries.append((key, _compile_build(value), None))
+        else:
+            entries.append((key, None, value))
+    
+    def build(slots):
+        result = {}
+        for key, child, slot in entries:
+            if child is not None:
+                result[key] = child(slots)
+            else:
+                result[key] = list(slots[slot])
+        return result
+    return build
+
+
+def compile_document(document, use_decimal=False, functions=None):
+    return ZovCompiler(use_decimal=use_decimal, functions=functions).compile(document)
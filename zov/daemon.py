@@ -0,0 +1,389 @@
+import os
+import json
+import stat
+import errno
+import struct
+import socket
+import tempfile
+import itertools
+import threading
+import socketserver
+from collections.abc import Mapping
+try:
+    from .cache import is_fresh
+    from .interpreter import RecordedEnviron, environ_matches
+except ImportError:
+    import cache as cache_module
+    import interpreter as interpreter_module
+    is_fresh = cache_module.is_fresh
+    RecordedEnviron = interpreter_module.RecordedEnviron
+    environ_matches = interpreter_module.environ_matches
+
+ERROR_TYPES = {
+    'SyntaxError': SyntaxError,
+    'ValueError': ValueError,
+    'KeyError': KeyError,
+    'FileNotFoundError': FileNotFoundError,
+}
+
+
+def _private_directory():
+    return os.path.join(tempfile.gettempdir(), f'zov-{os.getuid()}')
+
+
+def default_socket_path():
+    # XDG_RUNTIME_DIR is private to its user. Without it the socket goes
+    # in a directory of its own rather than in the shared temp directory.
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, f'zov-{os.getuid()}.sock')
+    return os.path.join(_private_directory(), 'zov.sock')
+
+
+def _make_private_directory(path):
+    # Another user may have created the directory first, so an existing
+    # one is used only if it is ours and closed to everyone else.
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(errno.EPERM, f"Socket directory '{path}' is not private to this user")
+
+
+def _encode(response):
+    return json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class _MissingEnviron(Exception):
+    def __init__(self, names):
+        super().__init__(names)
+        self.names = sorted(names)
+
+
+class ClientEnviron(Mapping):
+    # The part of a client's environment sent with a request. A name sent
+    # as null is unset; one that was not sent is unknown, and looking it
+    # up records it, so the client can be asked for it.
+    def __init__(self, values, complete=False):
+        self.values = values
+        self.complete = complete
+        self.missing = set()
+    
+    def unknown(self, names):
+        if self.complete:
+            return set()
+        return {name for name in names if name not in self.values}
+    
+    def __getitem__(self, name):
+        if not self.complete and name not in self.values:
+            self.missing.add(name)
+            raise KeyError(name)
+        value = self.values.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+    
+    def __iter__(self):
+        return (name for name, value in self.values.items() if value is not None)
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class ConfigEntry:
+    def __init__(self, interpreter, dependencies, env_values):
+        self.interpreter = interpreter
+        self.dependencies = dependencies
+        # The only part of the environment kept: it is all the document
+        # read, so it is enough to load it again when its files change.
+        self.env_values = env_values
+        self.used = 0
+        self.responses = {}
+        self.lock = threading.Lock()
+
+
+class ConfigServer:
+    # Evaluated documents are kept per file and options. Encoded responses
+    # are cached per path, so a repeated request costs one dict lookup.
+    # env() reads the environment sent with the request; a document is
+    # shared by every environment that agrees on the names it read. At
+    # most variants of them are kept per document, the least recently
+    # used going first.
+    def __init__(self, socket_path=None, interval=1.0, cache_dir=None, workers=None, functions=None, variants=16):
+        self.socket_path = socket_path or default_socket_path()
+        self.interval = interval
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.functions = functions
+        self.variants = variants
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._clock = itertools.count(1)
+        self._stopped = threading.Event()
+        self._server = None
+    
+    def _load(self, key, environ):
+        from . import load_interpreter
+        filename, use_decimal, optimize = key
+        dependencies = {}
+        recorded = RecordedEnviron(environ)
+        try:
+            interpreter = load_interpreter(filename, use_decimal=use_decimal, cache_dir=self.cache_dir, optimize=optimize,
+                                           workers=self.workers, dependencies=dependencies, functions=self.functions,
+                                           environ=recorded)
+        except Exception:
+            # Evaluated without a variable it needed, the document may
+            # fail where it would not have.
+            if environ.missing:
+                raise _MissingEnviron(environ.missing)
+            raise
+        if environ.missing:
+            raise _MissingEnviron(environ.missing)
+        return ConfigEntry(interpreter, dependencies, recorded.read)
+    
+    def _find(self, key, environ):
+        entries = self.entries.get(key, ())
+        missing = environ.unknown(name for entry in entries for name in entry.env_values)
+        if missing:
+            raise _MissingEnviron(missing)
+        for entry in entries:
+            if environ_matches(entry.env_values, environ):
+                entry.used = next(self._clock)
+                return entry
+        return None
+    
+    def _add(self, key, entry):
+        entries = self.entries.get(key, [])
+        if len(entries) >= self.variants:
+            oldest = min(entries, key=lambda e: e.used)
+            entries = [e for e in entries if e is not oldest]
+        entry.used = next(self._clock)
+        self.entries[key] = entries + [entry]
+    
+    def entry(self, filename, use_decimal=False, optimize=False, environ=None):
+        # environ holds the variables the client sent; without it, the
+        # daemon's own environment is used.
+        if environ is None:
+            environ = ClientEnviron(os.environ, complete=True)
+        elif not isinstance(environ, ClientEnviron):
+            environ = ClientEnviron(environ)
+        key = (os.path.abspath(filename), bool(use_decimal), bool(optimize))
+        entry = self._find(key, environ)
+        if entry is not None:
+            return entry
+        
+        # Concurrent requests for the same file wait for a single load.
+        with self._lock:
+            lock = self._loading.setdefault(key, threading.Lock())
+        with lock:
+            entry = self._find(key, environ)
+            if entry is None:
+                entry = self._load(key, environ)
+                self._add(key, entry)
+        return entry
+    
+    def request(self, filename, path=None, use_decimal=False, optimize=False, environ=None):
+        try:
+            entry = self.entry(filename, use_decimal, optimize, environ)
+            response = entry.responses.get(path)
+            if response is not None:
+                self.hits += 1
+                return response
+            self.misses += 1
+            with entry.lock:
+                response = entry.responses.get(path)
+                if response is None:
+                    data = entry.interpreter.to_dict() if path is None else entry.interpreter.lookup(path)
+                    response = entry.responses[path] = _encode({'ok': True, 'data': data})
+            return response
+        except _MissingEnviron as e:
+            return _encode({'ok': False, 'need': e.names})
+        except KeyError as e:
+            return _encode({'ok': False, 'type': 'KeyError', 'error': f"Path not found: '{e.args[0]}'"})
+        except Exception as e:
+            return _encode({'ok': False, 'type': type(e).__name__, 'error': str(e)})
+    
+    def handle(self, line):
+        try:
+            message = json.loads(line)
+            op = message.get('op', 'load')
+        except (ValueError, AttributeError):
+            return _encode({'ok': False, 'type': 'ValueError', 'error': 'Malformed request'})
+        
+        if op == 'load':
+            env = message.get('env', {})
+            if not isinstance(env, dict) or not all(value is None or isinstance(value, str) for value in env.values()):
+                return _encode({'ok': False, 'type': 'ValueError', 'error': 'Malformed request'})
+            return self.request(message.get('file', ''), message.get('path'), message.get('use_decimal', False),
+                                message.get('optimize', False), message.get('env'))
+        if op == 'stats':
+            documents = sum(len(entries) for entries in self.entries.values())
+            return _encode({'ok': True, 'data': {'documents': documents, 'hits': self.hits, 'misses': self.misses}})
+        if op == 'reload':
+            return _encode({'ok': True, 'data': self.check()})
+        return _encode({'ok': False, 'type': 'ValueError', 'error': f"Unknown operation: '{op}'"})
+    
+    def check(self):
+        # Stale documents are loaded again right away, so the next request
+        # is still served from memory. One that no longer loads is dropped
+        # and its error is reported on the next request.
+        changed = []
+        for key, entries in list(self.entries.items()):
+            if all(is_fresh(entry.dependencies) for entry in entries):
+                continue
+            changed.append(key[0])
+            reloaded = []
+            for entry in entries:
+                # A variant whose document now reads a variable it was not
+                # loaded with is dropped, and loaded on its next request.
+                try:
+                    variant = self._load(key, ClientEnviron(entry.env_values))
+                except Exception:
+                    continue
+                variant.used = entry.used
+                reloaded.append(variant)
+            if reloaded:
+                self.entries[key] = reloaded
+            else:
+                self.entries.pop(key, None)
+        return changed
+    
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+    
+    def _remove_stale_socket(self):
+        # A socket left by a daemon that died is removed. One that still
+        # accepts connections belongs to a running daemon, and anything
+        # that is not a socket is left for bind() to fail on.
+        try:
+            if not stat.S_ISSOCK(os.stat(self.socket_path).st_mode):
+                return
+        except FileNotFoundError:
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise OSError(errno.EADDRINUSE, f"A ZOV daemon is already serving on '{self.socket_path}'")
+        finally:
+            probe.close()
+    
+    def serve_forever(self):
+        if os.path.dirname(self.socket_path) == _private_directory():
+            _make_private_directory(_private_directory())
+        self._remove_stale_socket()
+        
+        server = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    self.wfile.write(server.handle(line))
+        
+        # The daemon reads any file a client names, so only its own user
+        # may connect. The socket is created with those permissions; a
+        # chmod after bind() would leave a window open to everyone.
+        umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon_threads = True
+        
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopped.set()
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+    
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class ConfigClient:
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(self.socket_path)
+            self._check_owner()
+        except OSError:
+            self._socket.close()
+            raise
+        self._reader = self._socket.makefile('rb')
+        self._env_names = {}
+    
+    def _check_owner(self):
+        # Requests carry environment variables, so they only go to a daemon
+        # of the same user, not to one that took the socket path first.
+        if hasattr(socket, 'SO_PEERCRED'):
+            credentials = self._socket.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+            uid = struct.unpack('3i', credentials)[1]
+        else:
+            uid = os.stat(self.socket_path).st_uid
+        if uid != os.getuid():
+            raise PermissionError(errno.EPERM, f"ZOV daemon at '{self.socket_path}' belongs to another user")
+    
+    def _call(self, message):
+        self._socket.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError(f"ZOV daemon at '{self.socket_path}' closed the connection")
+        response = json.loads(line)
+        if not response['ok']:
+            if 'need' in response:
+                raise _MissingEnviron(response['need'])
+            raise ERROR_TYPES.get(response.get('type'), ValueError)(response['error'])
+        return response['data']
+    
+    def load(self, filename, path=None, use_decimal=False, optimize=False, environ=None):
+        # env() is evaluated against this process's environment, as
+        # load_zov would, unless another one is given. Only the variables
+        # the daemon asks for are sent, and they are remembered per file.
+        if environ is None:
+            environ = os.environ
+        filename = os.path.abspath(filename)
+        names = self._env_names.get(filename, [])
+        while True:
+            try:
+                return self._call({'op': 'load', 'file': filename, 'path': path, 'use_decimal': use_decimal,
+                                   'optimize': optimize, 'env': {name: environ.get(name) for name in names}})
+            except _MissingEnviron as e:
+                if set(e.names) <= set(names):
+                    raise ValueError(f"ZOV daemon at '{self.socket_path}' asked again for {', '.join(e.names)}")
+                names = self._env_names[filename] = sorted(set(names) | set(e.names))
+    
+    def stats(self):
+        return self._call({'op': 'stats'})
+    
+    def reload(self):
+        return self._call({'op': 'reload'})
+    
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_zov_remote(filename, path=None, use_decimal=False, optimize=False, socket_path=None, timeout=None, environ=None):
+    with ConfigClient(socket_path, timeout) as client:
+        return client.load(filename, path, use_decimal, optimize, environ)
@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 4096
+
+# Arguments of these types are compared by value. Anything else is keyed by
+# its repr as well, since equal values can still print differently
+# (0.0 and -0.0, Decimal('1') and Decimal('1.0')).
+EXACT_TYPES = {str, int, bool, type(None)}
+
+_MISSING = object()
+
+
+def _key(args):
+    return tuple((type(arg), arg) if type(arg) in EXACT_TYPES else (type(arg), repr(arg)) for arg in args)
+
+
+class Function:
+    def __init__(self, name, func, min_args=0, max_args=None, pure=False, context=False, cache=None, usage=None):
+        self.name = name
+        self.func = func
+        self.min_args = min_args
+        self.max_args = max_args
+        self.pure = pure
+        self.context = context
+        # Results of a function that reads the interpreter may depend on it,
+        # so only context-free pure functions are cached.
+        self.cache = pure and not context if cache is None else cache and not context
+        self.usage = usage
+    
+    def check(self, count):
+        if count >= self.min_args and (self.max_args is None or count <= self.max_args):
+            return None
+        if self.max_args is None:
+            expected = f"at least {self.min_args}"
+        elif self.max_args == self.min_args:
+            expected = str(self.min_args)
+        elif self.max_args == self.min_args + 1:
+            expected = f"{self.min_args} or {self.max_args}"
+        else:
+            expected = f"{self.min_args} to {self.max_args}"
+        plural = '' if expected == '1' else 's'
+        usage = f" ({self.usage})" if self.usage else ''
+        return f"{self.name}() expects {expected} argument{plural}{usage}, got {count}"
+
+
+class FunctionRegistry:
+    # Functions callable from ZOV by name. A pure function returns the same
+    # result for the same arguments; the optimizer folds its calls on
+    # constants, and its results are kept in an LRU shared by every
+    # interpreter using the registry, so they carry over between loads.
+    def __init__(self, functions=None, cache_size=CACHE_SIZE):
+        self.functions = dict(functions or {})
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def register(self, name, func, arity=None, pure=False, context=False, cache=None, usage=None):
+        # arity is a count, a (min, max) pair with max None for no limit, or
+        # None for any number. With context=True, func also receives the
+        # interpreter as its first argument.
+        if arity is None:
+            min_args, max_args = 0, None
+        elif isinstance(arity, int):
+            min_args, max_args = arity, arity
+        else:
+            min_args, max_args = arity
+        self.functions[name] = Function(name, func, min_args, max_args, pure, context, cache, usage)
+        return func
+    
+    def function(self, name=None, **options):
+        def decorator(func):
+            return self.register(name or func.__name__, func, **options)
+        return decorator
+    
+    def get(self, name):
+        return self.functions.get(name)
+    
+    def __contains__(self, name):
+        return name in self.functions
+    
+    def copy(self):
+        return FunctionRegistry(self.functions, self.cache_size)
+    
+    def clear_cache(self):
+        with self._lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def call(self, function, interpreter, args):
+        if function.context:
+            return function.func(interpreter, *args)
+        if not function.cache:
+            return function.func(*args)
+        
+        # Keyed by the Function, so registering a name again never serves
+        # results of the function it replaced.
+        key = (function, _key(args))
+        with self._lock:
+            result = self.cache.get(key, _MISSING)
+            if result is not _MISSING:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        
+        result = function.func(*args)
+        with self._lock:
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+
+def _env(interpreter, name, default=None):
+    name = str(name)
+    value = interpreter.environ.get(name, default)
+    if value is None:
+        raise ValueError(f"Environment variable '{name}' not found and no default provided")
+    return value
+
+
+def _concat(interpreter, *args):
+    simplify = interpreter._simplify_value
+    return ''.join(str(simplify(arg)) for arg in args)
+
+
+def _join(interpreter, separator, *items):
+    simplify = interpreter._simplify_value
+    return str(separator).join(str(simplify(item)) for item in items)
+
+
+def _upper(value):
+    return str(value).upper()
+
+
+def _lower(value):
+    return str(value).lower()
+
+
+FUNCTIONS = FunctionRegistry()
+FUNCTIONS.register('env', _env, arity=(1, 2), context=True)
+# Cheaper to run again than to look up, so the built-ins are not cached.
+FUNCTIONS.register('concat', _concat, pure=True, context=True)
+FUNCTIONS.register('join', _join, arity=(2, None), pure=True, context=True, usage='separator, ...items')
+FUNCTIONS.register('upper', _upper, arity=1, pure=True, cache=False)
+FUNCTIONS.register('lower', _lower, arity=1, pure=True, cache=False)
+
+
+def register_function(name, func, arity=None, pure=False, context=False, cache=None, usage=None):
+    return FUNCTIONS.register(name, func, arity, pure, context, cache, usage)
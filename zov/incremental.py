@@ -0,0 +1,267 @@
+try:
+    from .ast import ZovDocument, ZovCategory, ZovItem, ZovInclude, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString
+    from .lexer import lex
+    from .parser import DeferredParser
+except ImportError:
+    import ast as ast_module
+    import lexer as lexer_module
+    import parser as parser_module
+    ZovDocument = ast_module.ZovDocument
+    ZovCategory = ast_module.ZovCategory
+    ZovItem = ast_module.ZovItem
+    ZovInclude = ast_module.ZovInclude
+    ZovVariable = ast_module.ZovVariable
+    ZovExpression = ast_module.ZovExpression
+    ZovFunctionCall = ast_module.ZovFunctionCall
+    ZovInterpolatedString = ast_module.ZovInterpolatedString
+    lex = lexer_module.lex
+    DeferredParser = parser_module.DeferredParser
+
+BLOCK_SIZE = 1 << 16
+
+
+def find_edit(old, new):
+    # Returns (start, end, new_end) such that old[start:end] was replaced by
+    # new[start:new_end]. Slices are compared in halving blocks, so the
+    # scan runs at memcmp speed.
+    limit = min(len(old), len(new))
+    start = 0
+    step = BLOCK_SIZE
+    while step:
+        while start + step <= limit and old[start:start + step] == new[start:start + step]:
+            start += step
+        step //= 2
+    
+    limit -= start
+    tail = 0
+    step = BLOCK_SIZE
+    while step:
+        while tail + step <= limit and old[len(old) - tail - step:len(old) - tail] == new[len(new) - tail - step:len(new) - tail]:
+            tail += step
+        step //= 2
+    return start, len(old) - tail, len(new) - tail
+
+
+def _shift(nodes, lines, line, columns):
+    # Moves nodes below an edit. Only those on the line where the edit
+    # ended change column; positions on later lines are line-relative.
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        kind = type(node)
+        if kind is ZovItem:
+            pending.extend(node.values)
+        elif kind is ZovCategory:
+            pending.extend(node.items)
+        elif kind is ZovVariable:
+            pending.append(node.value)
+        elif kind is ZovExpression:
+            pending.append(node.left)
+            pending.append(node.right)
+        elif kind is ZovFunctionCall:
+            pending.extend(node.args)
+        elif kind is ZovInterpolatedString:
+            pending.extend(value for part_type, value in node.parts if part_type == 'expr')
+        elif kind is not ZovInclude:
+            continue
+        if node.line == line:
+            node.column += columns
+        node.line += lines
+
+
+class StatementParser(DeferredParser):
+    # Remembers the last token consumed, so the end of a statement is known.
+    last = None
+    
+    def advance(self):
+        self.last = self.current
+        super().advance()
+
+
+class Chunk:
+    # One top-level statement: the nodes it parsed to and its span in the
+    # text, as offsets and as the line/column positions the lexer reports.
+    def __init__(self, nodes, start, end, line, column, end_line, end_column):
+        self.nodes = nodes
+        self.start = start
+        self.end = end
+        self.line = line
+        self.column = column
+        self.end_line = end_line
+        self.end_column = end_column
+
+
+def _start(chunk):
+    return chunk.start
+
+
+def _end(chunk):
+    return chunk.end
+
+
+def _line(chunk):
+    return chunk.line
+
+
+# bisect only takes key= from Python 3.10 on.
+def _bisect_left(chunks, value, key, low=0):
+    high = len(chunks)
+    while low < high:
+        middle = (low + high) // 2
+        if key(chunks[middle]) < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _bisect_right(chunks, value, key, low=0):
+    high = len(chunks)
+    while low < high:
+        middle = (low + high) // 2
+        if value < key(chunks[middle]):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class IncrementalDocument:
+    # Keeps a deferred parse of code up to date under text edits; includes
+    # stay ZovInclude placeholders for Parser.splice. An edit re-lexes and
+    # re-parses only the top-level statements it touches. Everything after
+    # it keeps its nodes, whose positions are shifted in place, so documents
+    # returned earlier see those positions move as well.
+    def __init__(self, code, base_path=None):
+        self.base_path = base_path
+        self.text = code
+        self.source = code
+        self.reparsed = 0
+        self.chunks = self._parse(code, 0, len(code), 1, 0)
+        self.document = self._document()
+    
+    def _parse(self, code, start, end, line, column):
+        region = code[start:end]
+        parser = StatementParser(lex(region, line, column), self.base_path)
+        
+        line_starts = [start - column]
+        newline = region.find('\n')
+        while newline >= 0:
+            line_starts.append(start + newline + 1)
+            newline = region.find('\n', newline + 1)
+        
+        chunks = []
+        while parser.peek():
+            first = parser.peek()
+            nodes = parser.parse_statement()
+            last = parser.last
+            # Statements end with '}' or ';', both one character long.
+            chunks.append(Chunk(nodes, line_starts[first.line - line] + first.column, line_starts[last.line - line] + last.column + 1,
+                                first.line, first.column, last.line, last.column + 1))
+        self.reparsed = len(chunks)
+        return chunks
+    
+    def _document(self):
+        return ZovDocument([node for chunk in self.chunks for node in chunk.nodes])
+    
+    def edit(self, start, end, text):
+        # Replaces text[start:end] with text and returns the new document.
+        code = self.text[:start] + text + self.text[end:]
+        if self.text is self.source:
+            self._update(code, start, end, start + len(text))
+        else:
+            # The last edit did not parse; diff against the text that did.
+            self._update(code, *find_edit(self.source, code))
+        return self.document
+    
+    def replace(self, code):
+        if code == self.source:
+            self.text = self.source
+        else:
+            self._update(code, *find_edit(self.source, code))
+        return self.document
+    
+    def offset(self, line, column):
+        # Text offset of a lexer position, found from the nearest statement.
+        position, current = 0, 1
+        if self.text is self.source:
+            index = _bisect_right(self.chunks, line, _line) - 1
+            if index >= 0:
+                chunk = self.chunks[index]
+                position, current = chunk.start - chunk.column, chunk.line
+        while current < line:
+            position = self.text.index('\n', position) + 1
+            current += 1
+        return position + column
+    
+    def _update(self, code, start, end, new_end):
+        self.text = code
+        chunks = self.chunks
+        delta = new_end - end
+        
+        # Statements ending after the edit starts and starting before it ends
+        # are parsed again, from the end of the statement before them.
+        first = _bisect_right(chunks, start, _end)
+        last = _bisect_left(chunks, end, _start, first)
+        if first:
+            region_start = chunks[first - 1].end
+            line, column = chunks[first - 1].end_line, chunks[first - 1].end_column
+        else:
+            region_start, line, column = 0, 1, 0
+        
+        # The region runs up to the next statement kept. Text ending in a
+        # token or a comment could continue into that statement, so then
+        # it is taken in as well.
+        while True:
+            region_end = chunks[last].start + delta if last < len(chunks) else len(code)
+            if last == len(chunks) or self._boundary(code, region_start, region_end):
+                break
+            last += 1
+        
+        try:
+            parsed = self._parse(code, region_start, region_end, line, column)
+        except Exception:
+            parsed = None
+        if parsed is None:
+            # Anything the region cannot parse alone, such as a brace that now
+            # closes elsewhere, is left to a parse of the whole text; it also
+            # reports the same error a full parse would.
+            self.chunks = self._parse(code, 0, len(code), 1, 0)
+            self.source = code
+            self.document = self._document()
+            return
+        
+        if last < len(chunks):
+            following = chunks[last]
+            newlines = code.count('\n', region_start, region_end)
+            if newlines:
+                new_line = line + newlines
+                new_column = region_end - code.rindex('\n', region_start, region_end) - 1
+            else:
+                new_line = line
+                new_column = column + region_end - region_start
+            old_line = following.line
+            lines = new_line - old_line
+            columns = new_column - following.column
+            for chunk in chunks[last:]:
+                chunk.start += delta
+                chunk.end += delta
+                if chunk.line == old_line:
+                    chunk.column += columns
+                    if chunk.end_line == old_line:
+                        chunk.end_column += columns
+                elif not lines:
+                    continue
+                _shift(chunk.nodes, lines, old_line, columns)
+                chunk.line += lines
+                chunk.end_line += lines
+        
+        chunks[first:last] = parsed
+        self.source = code
+        self.document = self._document()
+    
+    def _boundary(self, code, start, end):
+        if end == start or code[end - 1] not in ' \t\n':
+            return False
+        line_start = max(code.rfind('\n', start, end) + 1, start)
+        return '#' not in code[line_start:end]
@@ -1,12 +1,14 @@
 import os
+from collections import deque
+from collections.abc import Mapping
 try:
-    from .ast import ZovDocument, ZovCategory, ZovItem, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString
-    from .lexer import lex
-    from .parser import Parser
+    from .ast import ZovDocument, ZovCategory, ZovItem, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString, ZovValue, VariableRef, Identifier
+    from .query import compile_pattern
+    from .functions import FUNCTIONS
 except ImportError:
     import ast as ast_module
-    import lexer as lexer_module
-    import parser as parser_module
+    import query as query_module
+    import functions as functions_module
     ZovDocument = ast_module.ZovDocument
     ZovCategory = ast_module.ZovCategory
     ZovItem = ast_module.ZovItem
@@ -14,15 +16,49 @@ except ImportError:
     ZovExpression = ast_module.ZovExpression
     ZovFunctionCall = ast_module.ZovFunctionCall
     ZovInterpolatedString = ast_module.ZovInterpolatedString
-    lex = lexer_module.lex
-    Parser = parser_module.Parser
+    ZovValue = ast_module.ZovValue
+    VariableRef = ast_module.VariableRef
+    Identifier = ast_module.Identifier
+    compile_pattern = query_module.compile_pattern
+    FUNCTIONS = functions_module.FUNCTIONS
+
+
+class RecordedEnviron(Mapping):
+    # A view of environ that remembers each name looked up through it and
+    # the value it had (None when unset), so a result that read the
+    # environment can tell when it is out of date.
+    def __init__(self, environ):
+        self.environ = environ
+        self.read = {}
+    
+    def __getitem__(self, name):
+        value = self.read[name] = self.environ.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+    
+    def __iter__(self):
+        return iter(self.environ)
+    
+    def __len__(self):
+        return len(self.environ)
+
+
+def environ_matches(values, environ):
+    return all(environ.get(name) == value for name, value in values.items())
 
 
 class ZovInterpreter:
-    def __init__(self, use_decimal=False):
+    def __init__(self, use_decimal=False, environ=None, stats=None, functions=None):
         self.data = {}
+        self.tree = {}
+        self.index = {}
         self.variables = {}
         self.use_decimal = use_decimal
+        # Taken once, so env() is a dict lookup and one load sees one environment.
+        self.environ = environ if environ is not None else dict(os.environ)
+        self.stats = stats
+        self.functions = functions if functions is not None else FUNCTIONS
         
         if use_decimal:
             from decimal import Decimal
@@ -37,25 +73,38 @@ class ZovInterpreter:
                     self.eval(item)
         elif isinstance(node, ZovCategory):
             path = f"{parent_path}.{node.name}" if parent_path else node.name
-            if path not in self.data:
-                self.data[path] = {'__items__': {}, '__categories__': set()}
+            category = self.data.get(path)
+            if category is None:
+                category = self.data[path] = {'__items__': {}, '__categories__': {}}
+                siblings = self.data[parent_path]['__categories__'] if parent_path else self.tree
+                siblings[node.name] = category
+                self.index.setdefault(node.name, []).append(parent_path)
+            items = category['__items__']
+            categories = category['__categories__']
             
             for item in node.items:
                 if isinstance(item, ZovVariable):
                     self.eval_variable(item)
                 elif isinstance(item, ZovCategory):
-                    self.data[path]['__categories__'].add(item.name)
+                    # Caught here rather than when the output is built, so
+                    # nothing is written before the error.
+                    if item.name in items:
+                        line_info = f" at line {item.line}, column {item.column}" if item.line else ""
+                        raise ValueError(f"Cannot create category '{item.name}': name already used as an item{line_info}")
                     self.eval(item, path)
                 elif isinstance(item, ZovItem):
-                    if item.name in self.data[path]['__items__']:
+                    if item.name in items:
                         line_info = f" at line {item.line}, column {item.column}" if item.line else ""
                         raise ValueError(f"Duplicate item '{item.name}' in category '{path}'{line_info}")
-                    if item.name in self.data[path]['__categories__']:
+                    if item.name in categories:
                         line_info = f" at line {item.line}, column {item.column}" if item.line else ""
                         raise ValueError(f"Name collision: '{item.name}' is both a category and an item in '{path}'{line_info}")
                     
-                    evaluated_values = [self.eval_value(v) for v in item.values]
-                    self.data[path]['__items__'][item.name] = evaluated_values
+                    items[item.name] = self.eval_item(item, path)
+                    self.index.setdefault(item.name, []).append(path)
+    
+    def eval_item(self, item, path):
+        return [self.eval_value(v) for v in item.values]
     
     def get_category(self, category_name):
         if category_name in self.data:
@@ -66,6 +115,53 @@ class ZovInterpreter:
         category = self.get_category(category_name)
         return category.get(item_name, [])
     
+    def query(self, pattern):
+        compiled = compile_pattern(pattern)
+        if compiled.leaf is not None:
+            candidates = [(parent, compiled.leaf) for parent in self.index.get(compiled.leaf, ())]
+        else:
+            candidates = self._walk(compiled.prefix)
+        
+        result = {}
+        for parent, name in candidates:
+            path = f"{parent}.{name}" if parent else name
+            if path not in result and compiled.match(path):
+                category = self.data.get(path)
+                if category is not None:
+                    result[path] = self._category_dict(category)
+                else:
+                    result[path] = self._simplify_values(self.data[parent]['__items__'][name])
+        return result
+    
+    def lookup(self, path):
+        category = self.data.get(path)
+        if category is not None:
+            return self._category_dict(category)
+        parent, _, name = path.rpartition('.')
+        if parent in self.data and name in self.data[parent]['__items__']:
+            return self._simplify_values(self.data[parent]['__items__'][name])
+        raise KeyError(path)
+    
+    def _walk(self, prefix):
+        if prefix:
+            if prefix not in self.data:
+                return
+            pending = deque([prefix])
+        else:
+            pending = deque()
+            for name in self.tree:
+                yield None, name
+                pending.append(name)
+        
+        while pending:
+            path = pending.popleft()
+            category = self.data[path]
+            for name in category['__items__']:
+                yield path, name
+            for name in category['__categories__']:
+                yield path, name
+                pending.append(f"{path}.{name}")
+    
     def eval_variable(self, var_node):
         value = self.eval_value(var_node.value)
         self.variables[var_node.name] = value
@@ -80,56 +176,35 @@ class ZovInterpreter:
         if isinstance(value, ZovInterpolatedString):
             return self.eval_interpolated_string(value)
         
-        if isinstance(value, dict):
-            if value.get('__type__') == 'variable_ref':
-                var_name = value['name']
-                if var_name not in self.variables:
-                    raise ValueError(f"Undefined variable: {var_name}")
-                return self.variables[var_name]
-            return value
+        if isinstance(value, VariableRef):
+            var_name = value.name
+            if var_name not in self.variables:
+                raise ValueError(f"Undefined variable: {var_name}")
+            return self.variables[var_name]
         
         return value
     
     def eval_function(self, func_call):
+        return self.call_function(func_call, [self.eval_value(arg) for arg in func_call.args])
+    
+    def call_function(self, func_call, args):
         func_name = func_call.name
-        args = [self.eval_value(arg) for arg in func_call.args]
-        
-        if func_name == 'env':
-            if len(args) < 1 or len(args) > 2:
-                raise ValueError(f"env() expects 1 or 2 arguments, got {len(args)} at line {func_call.line}, column {func_call.column}")
-            
-            env_var = str(args[0])
-            default = args[1] if len(args) > 1 else None
-            
-            value = os.environ.get(env_var, default)
-            if value is None:
-                raise ValueError(f"Environment variable '{env_var}' not found and no default provided at line {func_call.line}, column {func_call.column}")
-            
-            return value
-        
-        elif func_name == 'concat':
-            return ''.join(str(self._simplify_value(arg)) for arg in args)
-        
-        elif func_name == 'join':
-            if len(args) < 2:
-                raise ValueError(f"join() expects at least 2 arguments (separator, ...items), got {len(args)} at line {func_call.line}, column {func_call.column}")
-            
-            separator = str(args[0])
-            items = [str(self._simplify_value(arg)) for arg in args[1:]]
-            return separator.join(items)
-        
-        elif func_name == 'upper':
-            if len(args) != 1:
-                raise ValueError(f"upper() expects 1 argument, got {len(args)} at line {func_call.line}, column {func_call.column}")
-            return str(args[0]).upper()
+        if self.stats is not None:
+            self.stats.call(func_name)
         
-        elif func_name == 'lower':
-            if len(args) != 1:
-                raise ValueError(f"lower() expects 1 argument, got {len(args)} at line {func_call.line}, column {func_call.column}")
-            return str(args[0]).lower()
-        
-        else:
+        function = self.functions.get(func_name)
+        if function is None:
             raise ValueError(f"Unknown function: {func_name} at line {func_call.line}, column {func_call.column}")
+        error = function.check(len(args))
+        if error is not None:
+            raise ValueError(f"{error} at line {func_call.line}, column {func_call.column}")
+        
+        try:
+            return self.functions.call(function, self, args)
+        except ValueError as e:
+            raise ValueError(f"{e} at line {func_call.line}, column {func_call.column}") from e
+        except Exception as e:
+            raise ValueError(f"{func_name}() failed: {e} at line {func_call.line}, column {func_call.column}") from e
     
     def eval_interpolated_string(self, interp_str):
         result = []
@@ -142,36 +217,30 @@ class ZovInterpreter:
                     raise ValueError(f"Undefined variable: {part_value} in interpolated string at line {interp_str.line}, column {interp_str.column}")
                 result.append(str(self._simplify_value(self.variables[part_value])))
             elif part_type == 'expr':
-                tokens = list(lex(part_value))
-                p = Parser(tokens)
-                expr_ast = p.parse_expression()
-                value = self.eval_value(expr_ast)
-                
-                if isinstance(value, dict) and value.get('__type__') == 'identifier':
-                    var_name = '$' + value['value']
-                    if var_name in self.variables:
-                        result.append(str(self._simplify_value(self.variables[var_name])))
-                    else:
-                        result.append(value['value'])
-                else:
-                    result.append(str(self._simplify_value(value)))
+                result.append(self.interpolate(self.eval_value(part_value)))
         
         return ''.join(result)
     
+    def interpolate(self, value):
+        if isinstance(value, Identifier):
+            var_name = '$' + value.value
+            if var_name in self.variables:
+                return str(self._simplify_value(self.variables[var_name]))
+            return value.value
+        return str(self._simplify_value(value))
+    
     def eval_expression(self, expr):
-        left = self.eval_value(expr.left)
-        right = self.eval_value(expr.right)
-        
+        return self.operate(expr, self.eval_value(expr.left), self.eval_value(expr.right))
+    
+    def operate(self, expr, left, right):
         if expr.operator == 'PLUS':
             if isinstance(left, str) or isinstance(right, str):
                 return str(self._simplify_value(left)) + str(self._simplify_value(right))
         
-        if isinstance(left, dict) and '__type__' in left:
-            if left['__type__'] == 'identifier':
-                raise ValueError(f"Cannot perform arithmetic on identifier '{left['value']}' at line {expr.line}, column {expr.column}")
-        if isinstance(right, dict) and '__type__' in right:
-            if right['__type__'] == 'identifier':
-                raise ValueError(f"Cannot perform arithmetic on identifier '{right['value']}' at line {expr.line}, column {expr.column}")
+        if isinstance(left, Identifier):
+            raise ValueError(f"Cannot perform arithmetic on identifier '{left.value}' at line {expr.line}, column {expr.column}")
+        if isinstance(right, Identifier):
+            raise ValueError(f"Cannot perform arithmetic on identifier '{right.value}' at line {expr.line}, column {expr.column}")
         
         if self.use_decimal:
             from decimal import Decimal
@@ -208,61 +277,45 @@ class ZovInterpreter:
         raise ValueError(f"Unknown operator: {expr.operator}")
     
     def _simplify_value(self, value):
-        if self.use_decimal:
-            from decimal import Decimal
-            if isinstance(value, Decimal):
-                return float(value)
-        
-        if isinstance(value, dict) and '__type__' in value:
-            if value['__type__'] == 'identifier':
-                return value['value']
-            elif value['__type__'] in ('date', 'datetime', 'time'):
-                return value['value']
-            elif value['__type__'] == 'duration':
-                return f"{value['value']}{value['unit']}"
-            elif value['__type__'] == 'size':
-                return f"{value['value']}{value['unit']}"
-        
+        if isinstance(value, ZovValue):
+            return value.simplify()
+        if self.use_decimal and isinstance(value, self.Decimal):
+            return float(value)
         return value
     
     def _simplify_values(self, values):
         return [self._simplify_value(v) for v in values]
     
-    def _deep_merge(self, target, source):
-        for key, value in source.items():
-            if key in target:
-                if isinstance(target[key], dict) and isinstance(value, dict):
-                    self._deep_merge(target[key], value)
-                else:
-                    target[key] = value
-            else:
-                target[key] = value
-    
-    def to_dict(self):
-        result = {}
+    def _category_dict(self, category):
+        simplify = self._simplify_value
+        result = {key: [simplify(v) for v in val] for key, val in category['__items__'].items()}
         
-        for path, content in sorted(self.data.items()):
-            parts = path.split('.')
-            current = result
-            
-            for i, part in enumerate(parts[:-1]):
-                if part not in current:
-                    current[part] = {}
-                elif not isinstance(current[part], dict):
-                    raise ValueError(f"Cannot create nested structure: '{part}' is already a value, not a category")
-                current = current[part]
-            
-            final_key = parts[-1]
-            if final_key not in current:
-                current[final_key] = {}
-            elif not isinstance(current[final_key], dict):
-                raise ValueError(f"Cannot create category '{final_key}': name already used as an item")
-            
-            simplified_items = {
-                key: self._simplify_values(val) 
-                for key, val in content['__items__'].items()
-            }
-            
-            self._deep_merge(current[final_key], simplified_items)
+        children = category['__categories__']
+        for name in sorted(children):
+            if name in result:
+                raise ValueError(f"Cannot create category '{name}': name already used as an item")
+            result[name] = self._category_dict(children[name])
         
-        return result
\ No newline at end of file
+        return result
+    
+    def to_dict(self):
+        return {name: self._category_dict(self.tree[name]) for name in sorted(self.tree)}
+    
+    def view(self):
+        return TreeView(self)
+
+
+class TreeView(Mapping):
+    # Same keys and values as to_dict(), but each top-level category is
+    # built only when it is read, so writers can stream the output.
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+    
+    def __getitem__(self, name):
+        return self.interpreter._category_dict(self.interpreter.tree[name])
+    
+    def __iter__(self):
+        return iter(sorted(self.interpreter.tree))
+    
+    def __len__(self):
+        return len(self.interpreter.tree)
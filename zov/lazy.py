@@ -0,0 +1,120 @@
+import os
+from collections.abc import Mapping
+try:
+    from .ast import ZovCategory, ZovItem, ZovVariable
+    from .interpreter import ZovInterpreter
+except ImportError:
+    import ast as ast_module
+    import interpreter as interpreter_module
+    ZovCategory = ast_module.ZovCategory
+    ZovItem = ast_module.ZovItem
+    ZovVariable = ast_module.ZovVariable
+    ZovInterpreter = interpreter_module.ZovInterpreter
+
+
+def select_paths(data, select):
+    result = {}
+    for path in select:
+        parts = path.split('.')
+        source = data
+        for part in parts:
+            if not isinstance(source, dict) or part not in source:
+                break
+            source = source[part]
+        else:
+            target = result
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = source
+    return result
+
+
+def _declares(nodes, parts):
+    # Whether nodes, merged as evaluation merges them, hold a category or
+    # item at the dotted path parts.
+    name, rest = parts[0], parts[1:]
+    children = []
+    for node in nodes:
+        if isinstance(node, ZovCategory) and node.name == name:
+            if not rest:
+                return True
+            children.extend(node.items)
+        elif isinstance(node, ZovItem) and node.name == name and not rest:
+            return True
+    return bool(children) and _declares(children, rest)
+
+
+class LazyConfig(Mapping):
+    def __init__(self, document, use_decimal=False, environ=None, select=None, functions=None):
+        self.document = document
+        self.use_decimal = use_decimal
+        self.environ = dict(os.environ) if environ is None else environ
+        self.functions = functions
+        self.select = tuple(select) if select else None
+        
+        self._chunks = {}
+        for index, node in enumerate(document.categories):
+            if isinstance(node, ZovCategory):
+                self._chunks.setdefault(node.name, []).append(index)
+        
+        if self.select is not None:
+            # Only roots that declare a selected path are kept, so the keys
+            # match what select_paths leaves of an eager load.
+            parts = [path.split('.') for path in self.select]
+            self._chunks = {name: indices for name, indices in self._chunks.items()
+                            if any(path[0] == name and _declares([document.categories[index] for index in indices], path) for path in parts)}
+        
+        self._values = {}
+        self._snapshots = {}
+        self._position = 0
+        self._scanner = ZovInterpreter(use_decimal=use_decimal, environ=self.environ, functions=functions)
+    
+    def __getitem__(self, name):
+        if name in self._values:
+            return self._values[name]
+        if name not in self._chunks:
+            raise KeyError(name)
+        
+        indices = self._chunks[name]
+        self._advance(indices[-1])
+        
+        interpreter = ZovInterpreter(use_decimal=self.use_decimal, environ=self.environ, functions=self.functions)
+        for index in indices:
+            interpreter.variables = dict(self._snapshots[index])
+            interpreter.eval(self.document.categories[index])
+        
+        value = interpreter.to_dict()[name]
+        if self.select is not None:
+            value = select_paths({name: value}, self.select).get(name, {})
+        self._values[name] = value
+        return value
+    
+    def __iter__(self):
+        return iter(sorted(self._chunks))
+    
+    def __len__(self):
+        return len(self._chunks)
+    
+    @property
+    def evaluated(self):
+        return sorted(self._values)
+    
+    def to_dict(self):
+        return {name: self[name] for name in self}
+    
+    def _advance(self, index):
+        categories = self.document.categories
+        while self._position <= index:
+            node = categories[self._position]
+            if isinstance(node, ZovCategory):
+                self._snapshots[self._position] = dict(self._scanner.variables)
+            self._apply_variables(node)
+            self._position += 1
+    
+    def _apply_variables(self, node):
+        if isinstance(node, ZovVariable):
+            self._scanner.eval_variable(node)
+        elif isinstance(node, ZovCategory):
+            for item in node.items:
+                if not isinstance(item, ZovItem):
+                    self._apply_variables(item)
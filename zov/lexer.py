@@ -1,131 +1,288 @@
 import re
 from collections import namedtuple
 from decimal import Decimal
+try:
+    from .ast import Duration, Size, Date, DateTime, Time
+except ImportError:
+    import ast as ast_module
+    Duration = ast_module.Duration
+    Size = ast_module.Size
+    Date = ast_module.Date
+    DateTime = ast_module.DateTime
+    Time = ast_module.Time
 
 Token = namedtuple('Token', ['type', 'value', 'line', 'column'])
 
+# Alternatives are tried in order, so frequent tokens come first. Patterns that
+# can start on the same character keep their relative order.
 TOKEN_SPECIFICATION = [
-    ('COMMENT', r'#[^\n]*'),
+    ('NEWLINE', r'\n'),
     ('NULL', r'\b(null|none)\b'),
     ('BOOL', r'\b(true|false)\b'),
-    ('DURATION', r'\d+(\.\d+)?(ms|s|m|h|d|w)'),
-    ('SIZE', r'\d+(\.\d+)?(B|KB|MB|GB|TB|KiB|MiB|GiB|TiB)'),
+    ('INCLUDE', r'\binclude\b'),
+    ('FUNCTION', r'[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*(?=\()'),
+    ('ID', r'[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*'),
+    ('SEMICOLON', r';'),
+    ('EQUALS', r'='),
+    ('VARIABLE', r'\$[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*'),
+    ('LBRACE', r'\{'),
+    ('RBRACE', r'\}'),
+    ('DURATION', r'(?P<DURATION_VALUE>\d+(?:\.\d+)?)(?P<DURATION_UNIT>ms|s|m|h|d|w)'),
+    ('SIZE', r'(?P<SIZE_VALUE>\d+(?:\.\d+)?)(?P<SIZE_UNIT>B|KB|MB|GB|TB|KiB|MiB|GiB|TiB)'),
     ('DATETIME', r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}'),
     ('DATE', r'\d{4}-\d{2}-\d{2}'),
     ('TIME', r'\d{2}:\d{2}(:\d{2})?'),
     ('NUMBER', r'-?\d+(\.\d+)?'),
-    ('STRING', r'"(?:[^"\\$]|\\.)*"'),
-    ('INTERPOLATED_STRING_MARKER', r'"(?:[^"\\]|\\.)*(?:\$(?:[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*|\{[^}]+\}))+(?:[^"\\]|\\.)*"'),
-    ('INCLUDE', r'\binclude\b'),
-    ('LBRACE', r'\{'),
-    ('RBRACE', r'\}'),
+    ('STRING', r'"[^"\\]*(?:\\.[^"\\]*)*"'),
     ('LPAREN', r'\('),
     ('RPAREN', r'\)'),
-    ('SEMICOLON', r';'),
     ('COMMA', r','),
-    ('EQUALS', r'='),
     ('PLUS', r'\+'),
     ('MINUS', r'-'),
     ('MULTIPLY', r'\*'),
     ('DIVIDE', r'/'),
     ('MODULO', r'%'),
-    ('VARIABLE', r'\$[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*'),
-    ('FUNCTION', r'[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*(?=\()'),
-    ('ID', r'[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*'),
+    ('COMMENT', r'#[^\n]*'),
     ('SKIP', r'[ \t]+'),
-    ('NEWLINE', r'\n'),
     ('MISMATCH', r'.'),
 ]
 
-def lex(code):
-    tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECIFICATION)
-    line_num = 1
-    line_start = 0
+TEMPORAL_TYPES = {'DATE': Date, 'DATETIME': DateTime, 'TIME': Time}
+
+TOKEN_REGEX = re.compile(r'[ \t]*(?:' + '|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECIFICATION) + ')')
+
+INTERPOLATION_REGEX = re.compile(
+    r'\\(?P<escape>.)'
+    r'|(?P<expr>\$\{)'
+    r'|\$(?P<var>[a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*)'
+    r'|(?P<text>[^\\$]+|\$)',
+    re.DOTALL
+)
+
+# Inside ${...} a quote opens a nested string, which may hold ${...} of its
+# own, so STRING can end too early; _closing finds the real end.
+STRING_SCAN_REGEX = re.compile(r'\\.|\$\{|"')
+EXPRESSION_SCAN_REGEX = re.compile(r'\\.|["}]')
+
+CHUNK_SIZE = 1 << 20
+
+# Strings and comments are matched whole, as _lex matches them, so only
+# braces outside both are seen.
+BRACE_REGEX = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|#[^\n]*|[{}]')
+
+ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+
+
+def _number(text):
+    return float(text) if '.' in text else int(text)
+
+
+def _scan_string(value, line_num, column):
+    if '$' in value:
+        parts = _interpolation_parts(value, line_num, column)
+        if any(part_type != 'text' for part_type, _ in parts):
+            return Token('INTERPOLATED_STRING', parts, line_num, column)
     
-    for match in re.finditer(tok_regex, code):
+    value = value[1:-1]
+    if '\\' in value:
+        value = value.replace('\\n', '\n').replace('\\t', '\t').replace('\\"', '"').replace('\\\\', '\\')
+    return Token('STRING', value, line_num, column)
+
+
+def _closing(code, pos, level):
+    # Even levels are inside a string, odd ones inside ${...}. Returns the
+    # position after the quote or brace that closes level, or -1.
+    base = level
+    while True:
+        match = (EXPRESSION_SCAN_REGEX if level & 1 else STRING_SCAN_REGEX).search(code, pos)
+        if match is None:
+            return -1
+        pos = match.end()
+        char = match.group()
+        if char == '"':
+            level += 1 if level & 1 else -1
+        elif char == '}':
+            level -= 1
+        elif char == '${':
+            level += 1
+        if level < base:
+            return pos
+
+
+def _interpolation_parts(value, line_num, column):
+    parts = []
+    current = []
+    pos = 1
+    end = len(value) - 1
+    # Expression positions are counted from the previous one, not from the
+    # start of the string, so strings with many ${...} stay linear.
+    expr_line = line_num
+    line_start = -column
+    counted = 0
+    
+    while pos < end:
+        match = INTERPOLATION_REGEX.match(value, pos, end)
         kind = match.lastgroup
-        value = match.group()
-        column = match.start() - line_start
-        
-        if kind == 'NEWLINE':
-            line_start = match.end()
-            line_num += 1
-            continue
-        elif kind in ('SKIP', 'COMMENT'):
-            continue
-        elif kind == 'MISMATCH':
-            raise SyntaxError(f'Unexpected character: {value!r} at line {line_num}, column {column}')
-        elif kind == 'INTERPOLATED_STRING_MARKER':
-            parts = []
-            current = ''
-            i = 1
-            while i < len(value) - 1:
-                if value[i] == '\\' and i + 1 < len(value) - 1:
-                    escape_map = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
-                    current += escape_map.get(value[i + 1], value[i + 1])
-                    i += 2
-                elif value[i] == '$':
-                    if current:
-                        parts.append(('text', current))
-                        current = ''
-                    if i + 1 < len(value) - 1 and value[i + 1] == '{':
-                        end = value.find('}', i + 2)
-                        if end != -1:
-                            var_expr = value[i + 2:end]
-                            parts.append(('expr', var_expr))
-                            i = end + 1
-                        else:
-                            raise SyntaxError(f'Unclosed interpolation at line {line_num}, column {column + i}')
-                    else:
-                        match_var = re.match(r'\$([a-zA-Z_\u0400-\u04FF][a-zA-Z_0-9\u0400-\u04FF]*)', value[i:])
-                        if match_var:
-                            parts.append(('var', '$' + match_var.group(1)))
-                            i += len(match_var.group(0))
-                        else:
-                            current += '$'
-                            i += 1
-                else:
-                    current += value[i]
-                    i += 1
+        pos = match.end()
+        if kind == 'text':
+            current.append(match.group(kind))
+        elif kind == 'escape':
+            char = match.group(kind)
+            current.append(ESCAPES.get(char, char))
+        else:
             if current:
-                parts.append(('text', current))
+                parts.append(('text', ''.join(current)))
+                current = []
+            if kind == 'var':
+                parts.append(('var', '$' + match.group(kind)))
+            else:
+                close = _closing(value, pos, 1)
+                if close < 0:
+                    raise SyntaxError(f'Unclosed interpolation at line {line_num}, column {column + match.start()}')
+                start = pos
+                newlines = value.count('\n', counted, start)
+                if newlines:
+                    expr_line += newlines
+                    line_start = value.rindex('\n', counted, start) + 1
+                counted = start
+                parts.append(('expr', list(lex(value[start:close - 1], expr_line, start - line_start))))
+                pos = close
+    
+    if current:
+        parts.append(('text', ''.join(current)))
+    return parts
+
+
+def lex(code, line=1, column=0):
+    return _lex(code, line, column, False)
+
+
+def split_source(code, size):
+    # Cuts code after top-level '}' into pieces of at least size characters,
+    # as (start, end, line, column) with the position each one starts at.
+    # Every piece begins a statement, so it lexes and parses on its own.
+    pieces = []
+    depth = 0
+    start = 0
+    line = 1
+    column = 0
+    pos = 0
+    while True:
+        for match in BRACE_REGEX.finditer(code, pos):
+            char = match.group()
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                end = match.end()
+                if depth == 0 and end - start >= size:
+                    pieces.append((start, end, line, column))
+                    newlines = code.count('\n', start, end)
+                    if newlines:
+                        line += newlines
+                        column = end - code.rindex('\n', start, end) - 1
+                    else:
+                        column += end - start
+                    start = end
+            elif char[0] == '"' and '${' in char:
+                close = _closing(code, match.start() + 1, 0)
+                if close > match.end():
+                    pos = close
+                    break
+        else:
+            break
+    if start < len(code) or not pieces:
+        pieces.append((start, len(code), line, column))
+    return pieces
+
+
+def lex_file(path, chunk_size=CHUNK_SIZE):
+    # Each chunk is lexed up to its last newline; only a string literal can
+    # continue past that point, so lexing stops at its quote and the rest is
+    # carried into the next chunk.
+    line = 1
+    column = 0
+    pending = ''
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                yield from lex(pending, line, column)
+                return
             
-            yield Token('INTERPOLATED_STRING', parts, line_num, column)
-        elif kind == 'STRING':
-            decoded = value[1:-1].replace('\\n', '\n').replace('\\t', '\t').replace('\\"', '"').replace('\\\\', '\\')
-            yield Token(kind, decoded, line_num, column)
-        elif kind == 'DURATION':
-            match_duration = re.match(r'(\d+(?:\.\d+)?)(ms|s|m|h|d|w)', value)
-            num = float(match_duration.group(1)) if '.' in match_duration.group(1) else int(match_duration.group(1))
-            unit = match_duration.group(2)
-            yield Token(kind, {'__type__': 'duration', 'value': num, 'unit': unit}, line_num, column)
-        elif kind == 'SIZE':
-            match_size = re.match(r'(\d+(?:\.\d+)?)(B|KB|MB|GB|TB|KiB|MiB|GiB|TiB)', value)
-            num = float(match_size.group(1)) if '.' in match_size.group(1) else int(match_size.group(1))
-            unit = match_size.group(2)
-            yield Token(kind, {'__type__': 'size', 'value': num, 'unit': unit}, line_num, column)
-        elif kind == 'DATETIME':
-            yield Token(kind, {'__type__': 'datetime', 'value': value}, line_num, column)
-        elif kind == 'TIME':
-            yield Token(kind, {'__type__': 'time', 'value': value}, line_num, column)
-        elif kind == 'NUMBER':
-            try:
-                if '.' in value:
-                    num_value = float(value)
-                else:
-                    num_value = int(value)
-                yield Token(kind, num_value, line_num, column)
-            except (ValueError, OverflowError) as e:
-                raise SyntaxError(f'Invalid number format: {value!r} at line {line_num}, column {column}: {e}')
-        elif kind == 'BOOL':
-            yield Token(kind, value == 'true', line_num, column)
-        elif kind == 'NULL':
-            yield Token(kind, None, line_num, column)
-        elif kind == 'DATE':
-            yield Token(kind, {'__type__': 'date', 'value': value}, line_num, column)
-        elif kind == 'VARIABLE':
-            yield Token(kind, value, line_num, column)
-        elif kind == 'FUNCTION':
-            yield Token(kind, value, line_num, column)
+            pending += chunk
+            cut = pending.rfind('\n') + 1
+            if not cut:
+                continue
+            
+            stop = yield from _lex(pending[:cut], line, column, True)
+            newlines = pending.count('\n', 0, stop)
+            if newlines:
+                line += newlines
+                column = stop - pending.rindex('\n', 0, stop) - 1
+            else:
+                column += stop
+            pending = pending[stop:]
+
+
+def _lex(code, line, column, partial):
+    line_num = line
+    line_start = -column
+    pos = 0
+    
+    while True:
+        for match in TOKEN_REGEX.finditer(code, pos):
+            kind = match.lastgroup
+            column = match.start(kind) - line_start
+            
+            if kind == 'NEWLINE':
+                line_start = match.end()
+                line_num += 1
+            elif kind == 'ID' or kind == 'VARIABLE' or kind == 'FUNCTION':
+                yield Token(kind, match.group(kind), line_num, column)
+            elif kind == 'NUMBER':
+                value = match.group(kind)
+                try:
+                    yield Token(kind, _number(value), line_num, column)
+                except (ValueError, OverflowError) as e:
+                    raise SyntaxError(f'Invalid number format: {value!r} at line {line_num}, column {column}: {e}')
+            elif kind == 'STRING':
+                value = match.group(kind)
+                start = match.start(kind)
+                end = match.end()
+                if '${' in value:
+                    end = _closing(code, start + 1, 0)
+                    if end < 0:
+                        if partial:
+                            return start
+                        end = match.end()
+                    else:
+                        value = code[start:end]
+                yield _scan_string(value, line_num, column)
+                if '\n' in value:
+                    line_num += value.count('\n')
+                    line_start = start + value.rindex('\n') + 1
+                if end > match.end():
+                    # The string ran past the match; lex again after it.
+                    pos = end
+                    break
+            elif kind == 'DURATION':
+                yield Token(kind, Duration(_number(match.group('DURATION_VALUE')), match.group('DURATION_UNIT')), line_num, column)
+            elif kind == 'SIZE':
+                yield Token(kind, Size(_number(match.group('SIZE_VALUE')), match.group('SIZE_UNIT')), line_num, column)
+            elif kind == 'DATETIME' or kind == 'DATE' or kind == 'TIME':
+                yield Token(kind, TEMPORAL_TYPES[kind](match.group(kind)), line_num, column)
+            elif kind == 'BOOL':
+                yield Token(kind, match.group(kind) == 'true', line_num, column)
+            elif kind == 'NULL':
+                yield Token(kind, None, line_num, column)
+            elif kind == 'COMMENT' or kind == 'SKIP':
+                continue
+            elif kind == 'MISMATCH':
+                if partial and match.group(kind) == '"':
+                    return match.start(kind)
+                raise SyntaxError(f'Unexpected character: {match.group(kind)!r} at line {line_num}, column {column}')
+            else:
+                yield Token(kind, match.group(kind), line_num, column)
         else:
-            yield Token(kind, value, line_num, column)
\ No newline at end of file
+            return len(code)
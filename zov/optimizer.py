@@ -0,0 +1,128 @@
+try:
+    from .ast import ZovDocument, ZovCategory, ZovItem, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString, VariableRef, Identifier
+    from .interpreter import ZovInterpreter
+except ImportError:
+    import ast as ast_module
+    import interpreter as interpreter_module
+    ZovDocument = ast_module.ZovDocument
+    ZovCategory = ast_module.ZovCategory
+    ZovItem = ast_module.ZovItem
+    ZovVariable = ast_module.ZovVariable
+    ZovExpression = ast_module.ZovExpression
+    ZovFunctionCall = ast_module.ZovFunctionCall
+    ZovInterpolatedString = ast_module.ZovInterpolatedString
+    VariableRef = ast_module.VariableRef
+    Identifier = ast_module.Identifier
+    ZovInterpreter = interpreter_module.ZovInterpreter
+
+def is_constant(value):
+    if isinstance(value, (ZovExpression, ZovFunctionCall, ZovInterpolatedString)):
+        return False
+    return not isinstance(value, VariableRef)
+
+
+class ZovOptimizer:
+    def __init__(self, use_decimal=False, functions=None):
+        self.use_decimal = use_decimal
+        self.eliminated = 0
+        self.constants = {}
+        self.assigned = set()
+        self._interpreter = ZovInterpreter(use_decimal=use_decimal, functions=functions)
+        self._interpreter.variables = self.constants
+    
+    def optimize(self, node):
+        if isinstance(node, ZovDocument):
+            return ZovDocument([self.optimize(item) for item in node.categories])
+        
+        if isinstance(node, ZovCategory):
+            return ZovCategory(node.name, [self.optimize(item) for item in node.items], node.line, node.column)
+        
+        if isinstance(node, ZovItem):
+            return ZovItem(node.name, [self.fold(v) for v in node.values], node.line, node.column)
+        
+        if isinstance(node, ZovVariable):
+            value = self.fold(node.value)
+            if is_constant(value):
+                self.constants[node.name] = value
+            else:
+                self.constants.pop(node.name, None)
+            self.assigned.add(node.name)
+            return ZovVariable(node.name, value, node.line, node.column)
+        
+        return node
+    
+    def fold(self, value):
+        if isinstance(value, ZovExpression):
+            return self.fold_expression(value)
+        
+        if isinstance(value, ZovFunctionCall):
+            return self.fold_function(value)
+        
+        if isinstance(value, ZovInterpolatedString):
+            return self.fold_interpolated_string(value)
+        
+        if isinstance(value, VariableRef) and value.name in self.constants:
+            self.eliminated += 1
+            return self.constants[value.name]
+        
+        return value
+    
+    def fold_expression(self, expr):
+        folded = ZovExpression(expr.operator, self.fold(expr.left), self.fold(expr.right), expr.line, expr.column)
+        if is_constant(folded.left) and is_constant(folded.right):
+            try:
+                result = self._interpreter.eval_expression(folded)
+            except Exception:
+                return folded
+            self.eliminated += 1
+            return result
+        return folded
+    
+    def fold_function(self, func_call):
+        folded = ZovFunctionCall(func_call.name, [self.fold(arg) for arg in func_call.args], func_call.line, func_call.column)
+        function = self._interpreter.functions.get(func_call.name)
+        if function is not None and function.pure and all(is_constant(arg) for arg in folded.args):
+            try:
+                result = self._interpreter.eval_function(folded)
+            except Exception:
+                return folded
+            self.eliminated += 1
+            return result
+        return folded
+    
+    def fold_interpolated_string(self, interp_str):
+        parts = []
+        for part_type, part_value in interp_str.parts:
+            text = None
+            if part_type == 'text':
+                text = part_value
+            elif part_type == 'var':
+                if part_value in self.constants:
+                    self.eliminated += 1
+                    text = str(self._interpreter._simplify_value(self.constants[part_value]))
+            elif part_type == 'expr':
+                part_value = self.fold(part_value)
+                if is_constant(part_value):
+                    text = self._interpolated_text(part_value)
+            
+            if text is None:
+                parts.append((part_type, part_value))
+            elif parts and parts[-1][0] == 'text':
+                parts[-1] = ('text', parts[-1][1] + text)
+            else:
+                parts.append(('text', text))
+        
+        if all(part_type == 'text' for part_type, _ in parts):
+            self.eliminated += 1
+            return ''.join(part_value for _, part_value in parts)
+        return ZovInterpolatedString(parts, interp_str.line, interp_str.column)
+    
+    def _interpolated_text(self, value):
+        if isinstance(value, Identifier):
+            var_name = '$' + value.value
+            if var_name in self.constants:
+                return str(self._interpreter._simplify_value(self.constants[var_name]))
+            if var_name in self.assigned:
+                return None
+            return value.value
+        return str(self._interpreter._simplify_value(value))
@@ -0,0 +1,184 @@
+import os
+import json
+import stat
+import struct
+import tempfile
+
+BINARY_MAGIC = b'ZOVB\x01'
+
+NULL = 0
+FALSE = 1
+TRUE = 2
+INT = 3
+FLOAT = 4
+STRING = 5
+LIST = 6
+MAP = 7
+
+FLOAT_STRUCT = struct.Struct('<d')
+
+
+def temp_output(filename):
+    # A file to write in place of filename and then os.replace() over it,
+    # so a failure halfway never leaves a truncated file. It goes next to
+    # the file a symlink points to, and gets that file's mode, or the one
+    # open() would give a new file.
+    target = os.path.realpath(filename)
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+    try:
+        os.fchmod(fd, mode)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    return fd, tmp_path, target
+
+
+def iter_json(data, indent=2):
+    # Only the top level is walked here, so a lazy mapping is serialized one
+    # category at a time; each category is encoded in a single call.
+    if indent is None:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        separator, opening, closing, colon = ',', '{', '}', ':'
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=indent)
+        pad = ' ' * indent
+        separator, opening, closing, colon = ',\n' + pad, '{\n' + pad, '\n}', ': '
+    
+    first = True
+    for key, value in data.items():
+        yield (opening if first else separator) + encoder.encode(str(key)) + colon
+        first = False
+        chunk = encoder.encode(value)
+        yield chunk if indent is None else chunk.replace('\n', '\n' + pad)
+    yield '{}' if first else closing
+
+
+def write_json(data, f, indent=2):
+    for chunk in iter_json(data, indent):
+        f.write(chunk)
+
+
+def _varint(value, out):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode(value, out):
+    if value is None:
+        out.append(NULL)
+    elif value is True:
+        out.append(TRUE)
+    elif value is False:
+        out.append(FALSE)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out.append(STRING)
+        _varint(len(data), out)
+        out += data
+    elif isinstance(value, int):
+        out.append(INT)
+        _varint(value << 1 if value >= 0 else (-value << 1) - 1, out)
+    elif isinstance(value, float):
+        out.append(FLOAT)
+        out += FLOAT_STRUCT.pack(value)
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST)
+        _varint(len(value), out)
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out.append(MAP)
+        _varint(len(value), out)
+        for key, item in value.items():
+            _encode(str(key), out)
+            _encode(item, out)
+    else:
+        raise TypeError(f'Cannot encode {type(value).__name__} value: {value!r}')
+
+
+def encode_binary(value):
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def write_binary(data, f):
+    head = bytearray(BINARY_MAGIC)
+    head.append(MAP)
+    _varint(len(data), head)
+    f.write(head)
+    for key, value in data.items():
+        out = bytearray()
+        _encode(str(key), out)
+        _encode(value, out)
+        f.write(out)
+
+
+def dumps_binary(data):
+    return BINARY_MAGIC + encode_binary(data)
+
+
+def _read_varint(buffer, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def decode_binary(buffer, pos=0):
+    tag = buffer[pos]
+    pos += 1
+    if tag == NULL:
+        return None, pos
+    if tag == TRUE:
+        return True, pos
+    if tag == FALSE:
+        return False, pos
+    if tag == STRING:
+        length, pos = _read_varint(buffer, pos)
+        return str(buffer[pos:pos + length], 'utf-8'), pos + length
+    if tag == INT:
+        value, pos = _read_varint(buffer, pos)
+        return (value >> 1) if not value & 1 else -((value + 1) >> 1), pos
+    if tag == FLOAT:
+        return FLOAT_STRUCT.unpack_from(buffer, pos)[0], pos + 8
+    if tag == LIST:
+        count, pos = _read_varint(buffer, pos)
+        result = []
+        for _ in range(count):
+            value, pos = decode_binary(buffer, pos)
+            result.append(value)
+        return result, pos
+    if tag == MAP:
+        count, pos = _read_varint(buffer, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = decode_binary(buffer, pos)
+            result[key], pos = decode_binary(buffer, pos)
+        return result, pos
+    raise ValueError(f'Invalid binary value tag {tag} at offset {pos - 1}')
+
+
+def loads_binary(data):
+    if data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError('Not a ZOV binary file')
+    value, _ = decode_binary(data, len(BINARY_MAGIC))
+    return value
+
+
+def read_binary(f):
+    return loads_binary(f.read())
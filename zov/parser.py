@@ -1,10 +1,21 @@
+import gc
 import os
+import re
+import time
+import pickle
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 try:
-    from .ast import ZovCategory, ZovItem, ZovDocument, ZovInclude, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString
-    from .lexer import lex
+    from .ast import ZovCategory, ZovItem, ZovDocument, ZovInclude, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString, VariableRef, Identifier
+    from .lexer import lex, lex_file, split_source
+    from .cache import read_source
+    from .stats import timed
 except ImportError:
     import ast as ast_module
     import lexer as lexer_module
+    import cache as cache_module
+    import stats as stats_module
     ZovCategory = ast_module.ZovCategory
     ZovItem = ast_module.ZovItem
     ZovDocument = ast_module.ZovDocument
@@ -13,24 +24,38 @@ except ImportError:
     ZovExpression = ast_module.ZovExpression
     ZovFunctionCall = ast_module.ZovFunctionCall
     ZovInterpolatedString = ast_module.ZovInterpolatedString
+    VariableRef = ast_module.VariableRef
+    Identifier = ast_module.Identifier
     lex = lexer_module.lex
+    lex_file = lexer_module.lex_file
+    split_source = lexer_module.split_source
+    read_source = cache_module.read_source
+    timed = stats_module.timed
 
 
 class Parser:
-    def __init__(self, tokens, base_path=None, seen_files=None):
-        self.tokens = list(tokens)
-        self.pos = 0
+    def __init__(self, tokens, base_path=None, seen_files=None, cache=None, includes=None, select=None, prefix=None, stats=None):
+        self.tokens = iter(tokens)
+        self.current = next(self.tokens, None)
+        self.lookahead = next(self.tokens, None)
         self.base_path = base_path or os.getcwd()
         self.seen_files = seen_files if seen_files is not None else set()
+        self.cache = cache
+        self.includes = includes if includes is not None else IncludeCache()
+        self.dependencies = {}
+        self.select = tuple(select) if select else None
+        self.prefix = prefix
+        self.stats = stats
     
     def peek(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        return self.current
     
     def peek_next(self):
-        return self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
+        return self.lookahead
     
     def advance(self):
-        self.pos += 1
+        self.current = self.lookahead
+        self.lookahead = next(self.tokens, None)
     
     def expect(self, token_type):
         tok = self.peek()
@@ -62,101 +87,131 @@ class Parser:
     def parse(self):
         categories = []
         while self.peek():
-            tok = self.peek()
-            if tok.type == 'VARIABLE':
-                categories.append(self.parse_variable())
-            elif tok.type == 'INCLUDE':
-                self.advance()
-                filename_tok = self.expect('STRING')
-                self.expect('SEMICOLON')
-                
-                try:
-                    included_abs = self._safe_include_path(
-                        filename_tok.value, 
-                        filename_tok.line, 
-                        filename_tok.column
-                    )
-                except SecurityError as e:
-                    raise SyntaxError(str(e))
-                
-                if not os.path.exists(included_abs):
-                    raise FileNotFoundError(
-                        f'Include file not found: {filename_tok.value} '
-                        f'at line {filename_tok.line}, column {filename_tok.column}'
-                    )
-                
-                if included_abs in self.seen_files:
-                    raise SyntaxError(
-                        f'Circular include detected: {filename_tok.value} '
-                        f'at line {filename_tok.line}, column {filename_tok.column}'
-                    )
-                
-                with open(included_abs, 'r', encoding='utf-8') as f:
-                    included_code = f.read()
-                
-                new_seen = self.seen_files | {included_abs}
-                included_tokens = lex(included_code)
-                included_parser = Parser(included_tokens, os.path.dirname(included_abs), new_seen)
-                included_ast = included_parser.parse()
-                
-                categories.extend(included_ast.categories)
-            else:
-                categories.append(self.parse_category())
+            categories.extend(self.parse_statement())
         return ZovDocument(categories)
     
-    def parse_category(self):
+    def parse_statement(self):
+        tok = self.peek()
+        if tok.type == 'VARIABLE':
+            return [self.parse_variable()]
+        if tok.type == 'INCLUDE':
+            return self.parse_include(self.prefix)
+        return [self.parse_category(self.prefix)]
+    
+    def parse_include(self, parent_path=None):
+        self.expect('INCLUDE')
+        filename_tok = self.expect('STRING')
+        self.expect('SEMICOLON')
+        return self.include(filename_tok.value, filename_tok.line, filename_tok.column, parent_path)
+    
+    def include(self, filename, line, column, parent_path=None):
+        try:
+            included_abs = self._safe_include_path(filename, line, column)
+        except SecurityError as e:
+            raise SyntaxError(str(e))
+        
+        if not self.includes.exists(included_abs):
+            raise FileNotFoundError(
+                f'Include file not found: {filename} '
+                f'at line {line}, column {column}'
+            )
+        
+        if included_abs in self.seen_files:
+            raise SyntaxError(
+                f'Circular include detected: {filename} '
+                f'at line {line}, column {column}'
+            )
+        
+        # With a selection the pruned document depends on where it is included.
+        key = included_abs if self.select is None else (included_abs, parent_path)
+        cache = self.cache if self.select is None else None
+        
+        cached = self.includes.documents.get(key)
+        if cached is None and cache is not None:
+            cached = cache.get(included_abs, self.includes.stat)
+            if cached is not None:
+                self.includes.documents[key] = cached
+        
+        if cached is not None:
+            included_ast, dependencies = cached
+            if not self.seen_files.intersection(dependencies):
+                self.dependencies.update(dependencies)
+                return included_ast.categories
+        
+        fingerprints = {} if cache is not None or self.includes.fingerprint else None
+        included_ast, dependencies = self.load_file(included_abs, fingerprints, self.seen_files | {included_abs}, parent_path)
+        dependencies[included_abs] = fingerprints[included_abs] if fingerprints else None
+        self.includes.documents[key] = (included_ast, dependencies)
+        if cache is not None:
+            cache.put(included_abs, included_ast, dependencies)
+        self.dependencies.update(dependencies)
+        
+        return included_ast.categories
+    
+    def load_file(self, path, fingerprints=None, seen_files=None, parent_path=None):
+        if self.stats is not None:
+            start = time.perf_counter()
+        
+        base_path = os.path.dirname(path)
+        document = timed(self.stats, 'read', self.includes.parsed, path, fingerprints) if self.select is None else None
+        if document is not None:
+            parser = Parser((), base_path, seen_files, self.cache, self.includes, self.select, parent_path, self.stats)
+            ast = parser.splice(document)
+        else:
+            tokens = timed(self.stats, 'read', self.includes.tokens, path, fingerprints)
+            if self.stats is not None:
+                tokens = self.stats.count_tokens(tokens, path)
+            parser = Parser(tokens, base_path, seen_files, self.cache, self.includes, self.select, parent_path, self.stats)
+            ast = parser.parse()
+        
+        if self.stats is not None:
+            self.stats.file(path)['seconds'] += time.perf_counter() - start
+        return ast, parser.dependencies
+    
+    def splice(self, document):
+        return ZovDocument(self._splice_items(document.categories, self.prefix))
+    
+    def _splice_items(self, items, parent_path):
+        result = []
+        for item in items:
+            if isinstance(item, ZovInclude):
+                result.extend(self.include(item.filename, item.line, item.column, parent_path))
+            elif isinstance(item, ZovCategory):
+                path = f"{parent_path}.{item.name}" if parent_path else item.name
+                items = self._splice_items(item.items, path)
+                # Categories without includes are kept as they are, so a
+                # reload can tell unchanged parts of the tree by identity.
+                if len(items) == len(item.items) and all(new is old for new, old in zip(items, item.items)):
+                    result.append(item)
+                else:
+                    result.append(ZovCategory(item.name, items, item.line, item.column))
+            else:
+                result.append(item)
+        return result
+    
+    def parse_category(self, parent_path=None):
         name_tok = self.expect('ID')
         name = name_tok.value
         self.expect('LBRACE')
         
+        path = f"{parent_path}.{name}" if parent_path else name
+        skip_items = self.select is not None and not is_selected(path, self.select)
+        # A selection can also name single items of a category it skips.
+        kept_items = selected_items(path, self.select) if skip_items else None
+        
         items = []
         while self.peek() and self.peek().type != 'RBRACE':
             tok = self.peek()
             if tok.type == 'ID':
                 next_tok = self.peek_next()
                 if next_tok and next_tok.type == 'LBRACE':
-                    items.append(self.parse_category())
+                    items.append(self.parse_category(path))
+                elif skip_items and tok.value not in kept_items:
+                    self.skip_item()
                 else:
                     items.append(self.parse_item())
             elif tok.type == 'INCLUDE':
-                self.advance()
-                filename_tok = self.expect('STRING')
-                self.expect('SEMICOLON')
-                
-                try:
-                    included_abs = self._safe_include_path(
-                        filename_tok.value,
-                        filename_tok.line,
-                        filename_tok.column
-                    )
-                except SecurityError as e:
-                    raise SyntaxError(str(e))
-                
-                if not os.path.exists(included_abs):
-                    raise FileNotFoundError(
-                        f'Include file not found: {filename_tok.value} '
-                        f'at line {filename_tok.line}, column {filename_tok.column}'
-                    )
-                
-                if included_abs in self.seen_files:
-                    raise SyntaxError(
-                        f'Circular include detected: {filename_tok.value} '
-                        f'at line {filename_tok.line}, column {filename_tok.column}'
-                    )
-                
-                with open(included_abs, 'r', encoding='utf-8') as f:
-                    included_code = f.read()
-                
-                new_seen = self.seen_files | {included_abs}
-                included_tokens = lex(included_code)
-                included_parser = Parser(included_tokens, os.path.dirname(included_abs), new_seen)
-                included_ast = included_parser.parse()
-                
-                for included_item in included_ast.categories:
-                    if isinstance(included_item, ZovVariable):
-                        items.append(included_item)
-                    else:
-                        items.append(included_item)
+                items.extend(self.parse_include(path))
             elif tok.type == 'VARIABLE':
                 items.append(self.parse_variable())
             else:
@@ -188,6 +243,11 @@ class Parser:
         self.expect('SEMICOLON')
         return ZovItem(name, values, name_tok.line, name_tok.column)
     
+    def skip_item(self):
+        while self.peek() and self.peek().type != 'SEMICOLON':
+            self.advance()
+        self.expect('SEMICOLON')
+    
     def parse_variable(self):
         var_tok = self.expect('VARIABLE')
         self.expect('EQUALS')
@@ -254,7 +314,21 @@ class Parser:
         
         if tok.type == 'INTERPOLATED_STRING':
             self.advance()
-            return ZovInterpolatedString(tok.value, tok.line, tok.column)
+            parts = []
+            for part_type, part_value in tok.value:
+                if part_type == 'expr':
+                    try:
+                        parser = Parser(part_value, self.base_path, includes=self.includes)
+                        part_value = parser.parse_expression()
+                        extra = parser.peek()
+                        if extra:
+                            raise SyntaxError(f'Expected end of interpolation, got {extra.type} at line {extra.line}, column {extra.column}')
+                    except SyntaxError as e:
+                        if ' at line ' in str(e):
+                            raise
+                        raise SyntaxError(f'{e} in interpolation at line {tok.line}, column {tok.column}')
+                parts.append((part_type, part_value))
+            return ZovInterpolatedString(parts, tok.line, tok.column)
         
         if tok.type in ('NUMBER', 'STRING', 'BOOL', 'NULL', 'DATE', 'DATETIME', 'TIME', 'DURATION', 'SIZE'):
             self.advance()
@@ -262,16 +336,173 @@ class Parser:
         
         if tok.type == 'VARIABLE':
             self.advance()
-            return {'__type__': 'variable_ref', 'name': tok.value}
+            return VariableRef(tok.value)
         
         if tok.type == 'ID':
             self.advance()
-            return {'__type__': 'identifier', 'value': tok.value}
+            return Identifier(tok.value)
         
         raise SyntaxError(
             f'Expected value, got {tok.type} at line {tok.line}, column {tok.column}'
         )
 
 
+class DeferredParser(Parser):
+    # Leaves includes as ZovInclude placeholders so a file can be parsed
+    # without knowing where it is included; Parser.splice resolves them.
+    def include(self, filename, line, column, parent_path=None):
+        return [ZovInclude(filename, line, column)]
+
+
+def parse_deferred(code, base_path, line=1, column=0):
+    return DeferredParser(lex(code, line, column), base_path).parse()
+
+
+@contextmanager
+def gc_paused():
+    # An AST is a tree, so collections while one is built or unpickled find
+    # nothing, yet with hundreds of thousands of new nodes they take most
+    # of the time.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def parse_pickled(code, base_path, line=1, column=0):
+    # Runs in a pool worker. The result is pickled here, so the pool hands
+    # back bytes and the unpickling happens where gc_paused can cover it.
+    with gc_paused():
+        return pickle.dumps(parse_deferred(code, base_path, line, column), pickle.HIGHEST_PROTOCOL)
+
+
+def is_selected(path, select):
+    return any(path == selected or path.startswith(selected + '.') for selected in select)
+
+
+def selected_items(path, select):
+    prefix = path + '.'
+    return {selected[len(prefix):] for selected in select if selected.startswith(prefix) and '.' not in selected[len(prefix):]}
+
+
+INCLUDE_REGEX = re.compile(r'\binclude\s+"([^"\\\n]*)"')
+
+# Files at least this large are parsed in pieces across the process pool.
+SPLIT_SIZE = 1 << 20
+
+
+class IncludeCache:
+    def __init__(self, workers=None, processes=False, fingerprint=False, sources=None):
+        self.documents = {}
+        self.workers = workers
+        self.fingerprint = fingerprint
+        self._stats = {}
+        self._sources = {}
+        self._parsed = {}
+        self._lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(workers) if workers else None
+        self._parsers = ProcessPoolExecutor(workers) if workers and processes else None
+        
+        # Sources read by the caller, as path -> (code, fingerprint).
+        for path, source in (sources or {}).items():
+            future = Future()
+            future.set_result(source)
+            self._sources[path] = future
+            if self._parsers is not None:
+                self._submit(path, source[0])
+    
+    def prefetch(self, path):
+        if self._readers is None:
+            return
+        with self._lock:
+            if path in self._sources:
+                return
+            self._sources[path] = self._readers.submit(self._read, path)
+    
+    def _read(self, path):
+        fingerprints = {}
+        code = read_source(path, fingerprints)
+        base_path = os.path.dirname(path)
+        
+        if self._parsers is not None:
+            with self._lock:
+                self._submit(path, code)
+        
+        # Only files inside the including file's directory can pass the
+        # traversal check, so nothing else is read ahead.
+        for filename in INCLUDE_REGEX.findall(code):
+            included = os.path.abspath(os.path.join(base_path, filename))
+            if included.startswith(base_path + os.sep):
+                self.prefetch(included)
+        return code, fingerprints[path]
+    
+    def _submit(self, path, code):
+        base_path = os.path.dirname(path)
+        if len(code) < SPLIT_SIZE:
+            self._parsed[path] = [self._parsers.submit(parse_pickled, code, base_path)]
+            return
+        # Enough pieces to keep every worker busy; each is parsed with the
+        # position it starts at, so nodes and errors carry file positions.
+        size = max(SPLIT_SIZE // 4, len(code) // (self.workers * 4))
+        self._parsed[path] = [self._parsers.submit(parse_pickled, code[start:end], base_path, line, column)
+                              for start, end, line, column in split_source(code, size)]
+    
+    def _source(self, path, fingerprints):
+        with self._lock:
+            future = self._sources.pop(path, None)
+        if future is None:
+            return None
+        code, fingerprint = future.result()
+        if fingerprints is not None:
+            fingerprints[path] = fingerprint
+        return code
+    
+    def tokens(self, path, fingerprints=None):
+        code = self._source(path, fingerprints)
+        if code is not None:
+            return lex(code)
+        if fingerprints is None:
+            return lex_file(path)
+        return lex(read_source(path, fingerprints))
+    
+    def parsed(self, path, fingerprints=None):
+        if self._parsers is None:
+            return None
+        self.prefetch(path)
+        if self._source(path, fingerprints) is None:
+            return None
+        with self._lock:
+            futures = self._parsed.pop(path)
+        # In order, so the first error raised is the one a whole-file parse
+        # would have reported.
+        with gc_paused():
+            documents = [pickle.loads(future.result()) for future in futures]
+        if len(documents) == 1:
+            return documents[0]
+        return ZovDocument([node for document in documents for node in document.categories])
+    
+    def close(self):
+        for executor in (self._readers, self._parsers):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def stat(self, path):
+        try:
+            return self._stats[path]
+        except KeyError:
+            try:
+                result = os.stat(path)
+            except OSError:
+                result = None
+            self._stats[path] = result
+            return result
+    
+    def exists(self, path):
+        return self.stat(path) is not None
+
+
 class SecurityError(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,46 @@
+import re
+from functools import lru_cache
+
+
+class PathPattern:
+    def __init__(self, pattern, regex, prefix, leaf):
+        self.pattern = pattern
+        self.regex = regex
+        self.prefix = prefix
+        self.leaf = leaf
+    
+    def match(self, path):
+        return self.regex.fullmatch(path) is not None
+    
+    def __repr__(self):
+        return f'PathPattern({self.pattern!r})'
+
+
+def _segment(part):
+    return ''.join('[^.]*' if char == '*' else '[^.]' if char == '?' else re.escape(char) for char in part)
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern):
+    parts = pattern.split('.')
+    if not pattern or any(not part or ('**' in part and part != '**') for part in parts):
+        raise ValueError(f"Invalid query pattern: '{pattern}'")
+    
+    regex = []
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == '**':
+            regex.append('.+' if last else r'(?:[^.]+\.)*')
+        else:
+            regex.append(_segment(part) if last else _segment(part) + r'\.')
+    
+    prefix = []
+    for part in parts:
+        if '*' in part or '?' in part:
+            break
+        prefix.append(part)
+    
+    # A literal last segment lets the name index narrow the candidates;
+    # otherwise the subtree under the literal prefix is walked.
+    leaf = None if '*' in parts[-1] or '?' in parts[-1] else parts[-1]
+    return PathPattern(pattern, re.compile(''.join(regex)), '.'.join(prefix), leaf)
@@ -0,0 +1,280 @@
+import os
+import threading
+from collections.abc import Mapping
+try:
+    from .ast import ZovCategory
+    from .cache import read_source, is_fresh
+    from .parser import Parser, IncludeCache
+    from .interpreter import ZovInterpreter, RecordedEnviron, environ_matches
+    from .incremental import IncrementalDocument
+    from .tracking import _same
+except ImportError:
+    import ast as ast_module
+    import cache as cache_module
+    import parser as parser_module
+    import interpreter as interpreter_module
+    import incremental as incremental_module
+    import tracking as tracking_module
+    ZovCategory = ast_module.ZovCategory
+    read_source = cache_module.read_source
+    is_fresh = cache_module.is_fresh
+    Parser = parser_module.Parser
+    IncludeCache = parser_module.IncludeCache
+    ZovInterpreter = interpreter_module.ZovInterpreter
+    IncrementalDocument = incremental_module.IncrementalDocument
+    _same = tracking_module._same
+
+
+class FileStore(IncludeCache):
+    # Keeps the deferred AST of every file between loads. A file is read
+    # again only when its size or mtime moved, and parsed again only when
+    # its content did; then only the top-level statements the change
+    # touched are, so the others keep their nodes.
+    def __init__(self):
+        super().__init__(fingerprint=True)
+        self.files = {}
+        self.parses = 0
+    
+    def parsed(self, path, fingerprints=None):
+        entry = self.files.get(path)
+        st = self.stat(path)
+        if entry is not None and st is not None and (st.st_mtime_ns, st.st_size) == entry[0][:2]:
+            fingerprint, source = entry
+        else:
+            read = {}
+            code = read_source(path, read)
+            fingerprint = read[path]
+            if entry is None:
+                source = IncrementalDocument(code, os.path.dirname(path))
+                self.parses += 1
+            else:
+                source = entry[1]
+                if entry[0][2] != fingerprint[2]:
+                    source.replace(code)
+                    self.parses += 1
+            self.files[path] = (fingerprint, source)
+        
+        if fingerprints is not None:
+            fingerprints[path] = fingerprint
+        return source.document
+    
+    def changed(self, dependencies):
+        self._stats = {}
+        return {path for path, fingerprint in dependencies.items() if not is_fresh({path: fingerprint}, self.stat)}
+    
+    def invalidate(self, changed):
+        # Spliced includes record every file below them, so only those
+        # above a changed file are spliced again.
+        for key, (_, dependencies) in list(self.documents.items()):
+            if not changed.isdisjoint(dependencies):
+                del self.documents[key]
+        for path in changed:
+            if not os.path.exists(path):
+                self.files.pop(path, None)
+    
+    def prune(self, dependencies):
+        # A file that is no longer included is not watched, so its splice
+        # could go stale before it is included again.
+        for key in list(self.documents):
+            if key not in dependencies:
+                del self.documents[key]
+
+
+def _diff(old, new, prefix, changed):
+    for name in new:
+        path = f'{prefix}.{name}' if prefix else name
+        if name not in old:
+            changed.append(path)
+        elif isinstance(old[name], dict) and isinstance(new[name], dict):
+            _diff(old[name], new[name], path, changed)
+        elif not _same(old[name], new[name]):
+            changed.append(path)
+    for name in old:
+        if name not in new:
+            changed.append(f'{prefix}.{name}' if prefix else name)
+
+
+class ReloadableConfig(Mapping):
+    def __init__(self, filename, use_decimal=False, environ=None, functions=None):
+        self.path = os.path.abspath(filename)
+        self.use_decimal = use_decimal
+        self.functions = functions
+        # Read again on every reload, so env() follows changes to it.
+        self.environ = os.environ if environ is None else environ
+        self.env_values = {}
+        self.store = FileStore()
+        self.dependencies = {}
+        self.error = None
+        
+        self._chunks = []
+        self._before = []
+        self._after = []
+        self._reads = []
+        self._values = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.reload()
+    
+    def __getitem__(self, name):
+        return self._values[name]
+    
+    def __iter__(self):
+        return iter(sorted(self._values))
+    
+    def __len__(self):
+        return len(self._values)
+    
+    def to_dict(self):
+        return {name: self._values[name] for name in self}
+    
+    def reload(self):
+        with self._lock:
+            return self._reload(self.store.changed(self.dependencies) if self.dependencies else set())
+    
+    def poll(self):
+        with self._lock:
+            changed = self.store.changed(self.dependencies)
+            if changed or not environ_matches(self.env_values, self.environ):
+                return self._reload(changed)
+            return []
+    
+    def _reload(self, changed):
+        self.store.invalidate(changed)
+        environ = dict(self.environ)
+        try:
+            fingerprints = {}
+            parser = Parser((), os.path.dirname(self.path), None, None, self.store)
+            document, dependencies = parser.load_file(self.path, fingerprints, {self.path})
+            dependencies.update(fingerprints)
+            
+            chunks = document.categories
+            before, after, reads, values = self._evaluate(chunks, environ)
+        except Exception:
+            # Splices made during a failed reload are not covered by the
+            # committed fingerprints, so none of them can be trusted later.
+            self.store.documents.clear()
+            # Parsing files whole and evaluating only part of the document
+            # can hit a different error first; report the one load_zov would.
+            parser = Parser((), os.path.dirname(self.path))
+            self._interpreter(environ).eval(parser.load_file(self.path, None, {self.path})[0])
+            raise
+        self.store.prune(dependencies)
+        
+        changed_paths = []
+        for name in sorted(set(values) | set(self._values)):
+            old = self._values.get(name)
+            new = values.get(name)
+            if old is new:
+                continue
+            if old is None or new is None:
+                changed_paths.append(name)
+            else:
+                _diff(old, new, name, changed_paths)
+        
+        self._chunks, self._before, self._after, self._reads, self._values = chunks, before, after, reads, values
+        self.dependencies = dependencies
+        self.env_values = {}
+        for read in reads:
+            if read:
+                self.env_values.update(read)
+        return changed_paths
+    
+    def _evaluate(self, chunks, environ):
+        # A chunk whose node and incoming variables are both unchanged, and
+        # whose env() lookups still give the same values, leaves the same
+        # variables behind, so its old snapshot is reused.
+        # Every chunk of a category that changed anywhere is evaluated
+        # again together, so merging and duplicate checks still apply.
+        old_index = {id(chunk): index for index, chunk in enumerate(self._chunks)}
+        groups = {}
+        for index, chunk in enumerate(chunks):
+            if isinstance(chunk, ZovCategory):
+                groups.setdefault(chunk.name, []).append(index)
+        
+        variables = {}
+        before = []
+        after = []
+        reads = []
+        dirty = set()
+        interpreters = {}
+        for index, chunk in enumerate(chunks):
+            old = old_index.get(id(chunk))
+            reused = (old is not None and (variables is self._before[old] or _same(variables, self._before[old]))
+                      and (not self._reads[old] or environ_matches(self._reads[old], environ)))
+            before.append(variables)
+            reads.append(self._reads[old] if reused else None)
+            
+            if isinstance(chunk, ZovCategory) and (not reused or chunk.name in dirty):
+                dirty.add(chunk.name)
+                interpreter = interpreters.get(chunk.name)
+                if interpreter is None:
+                    interpreter = interpreters[chunk.name] = self._interpreter(environ)
+                    for earlier in groups[chunk.name]:
+                        if earlier == index:
+                            break
+                        interpreter.variables = dict(before[earlier])
+                        interpreter.eval(chunks[earlier])
+                interpreter.variables = dict(variables)
+                interpreter.eval(chunk)
+                variables = interpreter.variables
+            elif reused:
+                variables = self._after[old]
+            else:
+                interpreter = self._interpreter(environ)
+                interpreter.variables = dict(variables)
+                interpreter.eval_variable(chunk)
+                variables = interpreter.variables
+                reads[index] = interpreter.environ.read
+            after.append(variables)
+        
+        # A category that lost or gained a chunk is rebuilt as well.
+        old_groups = {}
+        for chunk in self._chunks:
+            if isinstance(chunk, ZovCategory):
+                old_groups.setdefault(chunk.name, []).append(id(chunk))
+        for name, indices in groups.items():
+            if name not in dirty and [id(chunks[index]) for index in indices] != old_groups.get(name):
+                dirty.add(name)
+                interpreter = interpreters[name] = self._interpreter(environ)
+                for index in indices:
+                    interpreter.variables = dict(before[index])
+                    interpreter.eval(chunks[index])
+        
+        values = {}
+        for name in groups:
+            if name in dirty:
+                interpreter = interpreters[name]
+                values[name] = interpreter._category_dict(interpreter.tree[name])
+                # A category is evaluated as a whole, so each of its chunks
+                # depends on everything any of them read.
+                for index in groups[name]:
+                    reads[index] = interpreter.environ.read
+            else:
+                values[name] = self._values[name]
+        return before, after, reads, values
+    
+    def _interpreter(self, environ):
+        return ZovInterpreter(use_decimal=self.use_decimal, environ=RecordedEnviron(environ), functions=self.functions)
+    
+    def watch(self, callback, interval=1.0):
+        # Polls the files of the include tree; callback receives the changed
+        # paths. A reload that fails keeps the previous values and sets
+        # error, and is retried on the next poll.
+        def run():
+            while not self._stopped.wait(interval):
+                try:
+                    changed = self.poll()
+                except Exception as e:
+                    self.error = e
+                    continue
+                self.error = None
+                if changed:
+                    callback(changed)
+        
+        self._stopped.clear()
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+    
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,171 @@
+import os
+import mmap
+import struct
+from collections.abc import Mapping
+try:
+    from .output import _encode, _varint, _read_varint, decode_binary, temp_output
+except ImportError:
+    import output as output_module
+    _encode = output_module._encode
+    _varint = output_module._varint
+    _read_varint = output_module._read_varint
+    decode_binary = output_module.decode_binary
+    temp_output = output_module.temp_output
+
+SNAPSHOT_MAGIC = b'ZOVS\x01'
+HEADER = struct.Struct('<5sQQ')
+ENTRY = struct.Struct('<QQ')
+
+
+def _write_category(f, offset, path, category, entries):
+    # Children are written before their parent, so a record can point at
+    # the records of its subcategories directly.
+    items = {}
+    children = {}
+    for name, value in category.items():
+        if isinstance(value, Mapping):
+            child_path = f'{path}.{name}' if path else name
+            offset = _write_category(f, offset, child_path, value, entries)
+            children[name] = entries[child_path]
+        else:
+            items[name] = value
+    
+    record = bytearray()
+    _encode(items, record)
+    _encode(children, record)
+    f.write(record)
+    entries[path] = offset
+    return offset + len(record)
+
+
+def write_snapshot(data, filename):
+    fd, tmp_path, target = temp_output(filename)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(SNAPSHOT_MAGIC, 0, 0))
+            entries = {}
+            offset = _write_category(f, HEADER.size, '', data, entries)
+            
+            # Paths are sorted by their utf-8 bytes so readers can
+            # binary-search the index inside the mapped file.
+            keys = sorted((path.encode('utf-8'), record) for path, record in entries.items())
+            blob = bytearray()
+            table = bytearray()
+            for key, record in keys:
+                table += ENTRY.pack(offset + len(blob), record)
+                _varint(len(key), blob)
+                blob += key
+            f.write(blob)
+            f.write(table)
+            
+            f.seek(0)
+            f.write(HEADER.pack(SNAPSHOT_MAGIC, offset + len(blob), len(keys)))
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class Snapshot(Mapping):
+    # Values are decoded from the mapped file on every access and never
+    # kept, so processes opening the same snapshot share it through the
+    # page cache.
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"Not a ZOV snapshot: '{filename}'")
+        magic, self._index, self._count = HEADER.unpack_from(self._mmap)
+        if magic != SNAPSHOT_MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a ZOV snapshot: '{filename}'")
+        self.filename = filename
+        self._root = self._find('')
+    
+    def _find(self, path):
+        key = path.encode('utf-8')
+        buffer = self._mmap
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, record = ENTRY.unpack_from(buffer, self._index + middle * ENTRY.size)
+            length, start = _read_varint(buffer, key_offset)
+            current = buffer[start:start + length]
+            if current == key:
+                return record
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+    
+    def _record(self, offset):
+        items, offset = decode_binary(self._mmap, offset)
+        children, _ = decode_binary(self._mmap, offset)
+        return items, children
+    
+    def _category_dict(self, offset):
+        result, children = self._record(offset)
+        for name, child in children.items():
+            result[name] = self._category_dict(child)
+        return result
+    
+    def __getitem__(self, name):
+        offset = self._find(name) if name and '.' not in name else None
+        if offset is not None:
+            return self._category_dict(offset)
+        items, _ = self._record(self._root)
+        return items[name]
+    
+    def __iter__(self):
+        items, children = self._record(self._root)
+        yield from items
+        yield from children
+    
+    def __len__(self):
+        items, children = self._record(self._root)
+        return len(items) + len(children)
+    
+    def lookup(self, path):
+        offset = self._find(path)
+        if offset is not None and path:
+            return self._category_dict(offset)
+        
+        parent, _, name = path.rpartition('.')
+        offset = self._find(parent)
+        if offset is not None:
+            items, _ = self._record(offset)
+            if name in items:
+                return items[name]
+        raise KeyError(path)
+    
+    def get_category(self, category_name):
+        offset = self._find(category_name)
+        if offset is None or not category_name:
+            return {}
+        return self._record(offset)[0]
+    
+    def get_item(self, category_name, item_name):
+        return self.get_category(category_name).get(item_name, [])
+    
+    def paths(self):
+        buffer = self._mmap
+        for index in range(self._count):
+            key_offset, _ = ENTRY.unpack_from(buffer, self._index + index * ENTRY.size)
+            length, start = _read_varint(buffer, key_offset)
+            if length:
+                yield str(buffer[start:start + length], 'utf-8')
+    
+    def to_dict(self):
+        return self._category_dict(self._root)
+    
+    def close(self):
+        self._mmap.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,139 @@
+import time
+from contextlib import contextmanager
+try:
+    from .ast import ZovNode, ZovDocument, ZovCategory, ZovItem, ZovVariable, ZovExpression, ZovFunctionCall, ZovInterpolatedString
+except ImportError:
+    import ast as ast_module
+    ZovNode = ast_module.ZovNode
+    ZovDocument = ast_module.ZovDocument
+    ZovCategory = ast_module.ZovCategory
+    ZovItem = ast_module.ZovItem
+    ZovVariable = ast_module.ZovVariable
+    ZovExpression = ast_module.ZovExpression
+    ZovFunctionCall = ast_module.ZovFunctionCall
+    ZovInterpolatedString = ast_module.ZovInterpolatedString
+
+
+def timed(stats, phase, func, *args, **kwargs):
+    if stats is None:
+        return func(*args, **kwargs)
+    with stats.phase(phase):
+        return func(*args, **kwargs)
+
+
+# read and lex are spent inside parse and are listed under it.
+PHASE_ORDER = ['parse', 'read', 'lex', 'optimize', 'eval', 'to_dict', 'write']
+SUBPHASES = {'read', 'lex'}
+
+NODE_NAMES = {
+    ZovCategory: 'categories',
+    ZovItem: 'items',
+    ZovVariable: 'variables',
+    ZovExpression: 'expressions',
+    ZovFunctionCall: 'function_calls',
+    ZovInterpolatedString: 'interpolations',
+}
+
+
+class LoadStats:
+    def __init__(self):
+        self.phases = {}
+        self.tokens = 0
+        self.nodes = {}
+        self.files = {}
+        self.calls = {}
+    
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+    
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+    
+    def call(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+    
+    def file(self, path):
+        return self.files.setdefault(path, {'seconds': 0.0, 'tokens': 0})
+    
+    def count_tokens(self, tokens, path):
+        # Time spent inside the lexer, including chunked reads from disk.
+        clock = time.perf_counter
+        tokens = iter(tokens)
+        entry = self.file(path)
+        count = 0
+        spent = 0.0
+        try:
+            while True:
+                start = clock()
+                try:
+                    tok = next(tokens)
+                except StopIteration:
+                    return
+                finally:
+                    spent += clock() - start
+                count += 1
+                yield tok
+        finally:
+            entry['tokens'] += count
+            self.tokens += count
+            self.add('lex', spent)
+    
+    def count_nodes(self, node):
+        if isinstance(node, ZovDocument):
+            for item in node.categories:
+                self.count_nodes(item)
+            return
+        
+        name = NODE_NAMES.get(type(node))
+        if name is not None:
+            self.nodes[name] = self.nodes.get(name, 0) + 1
+        
+        if isinstance(node, ZovCategory):
+            children = node.items
+        elif isinstance(node, ZovItem):
+            children = node.values
+        elif isinstance(node, ZovVariable):
+            children = [node.value]
+        elif isinstance(node, ZovExpression):
+            children = [node.left, node.right]
+        elif isinstance(node, ZovFunctionCall):
+            children = node.args
+        elif isinstance(node, ZovInterpolatedString):
+            children = [value for part_type, value in node.parts if part_type == 'expr']
+        else:
+            children = []
+        
+        for child in children:
+            if isinstance(child, ZovNode):
+                self.count_nodes(child)
+    
+    def to_dict(self):
+        return {
+            'phases': dict(self.phases),
+            'tokens': self.tokens,
+            'nodes': dict(self.nodes),
+            'files': {path: dict(entry) for path, entry in self.files.items()},
+            'calls': dict(self.calls),
+        }
+    
+    def report(self):
+        lines = ['Phases:']
+        order = {phase: index for index, phase in enumerate(PHASE_ORDER)}
+        for phase in sorted(self.phases, key=lambda name: order.get(name, len(order))):
+            indent = '    ' if phase in SUBPHASES else '  '
+            lines.append(f'{indent}{phase:<10} {self.phases[phase] * 1000:9.2f} ms')
+        lines.append(f'Tokens: {self.tokens}')
+        if self.nodes:
+            lines.append('Nodes: ' + ', '.join(f'{name}={count}' for name, count in sorted(self.nodes.items())))
+        if self.files:
+            lines.append('Files (including nested includes):')
+            for path, entry in sorted(self.files.items(), key=lambda pair: -pair[1]['seconds']):
+                lines.append(f"  {entry['seconds'] * 1000:9.2f} ms {entry['tokens']:9d} tokens  {path}")
+        if self.calls:
+            lines.append('Calls: ' + ', '.join(f'{name}()={count}' for name, count in sorted(self.calls.items())))
+        return '\n'.join(lines)
@@ -0,0 +1,191 @@
+try:
+    from .ast import VariableRef, Identifier
+    from .interpreter import ZovInterpreter, RecordedEnviron
+except ImportError:
+    import ast as ast_module
+    import interpreter as interpreter_module
+    VariableRef = ast_module.VariableRef
+    Identifier = ast_module.Identifier
+    ZovInterpreter = interpreter_module.ZovInterpreter
+    RecordedEnviron = interpreter_module.RecordedEnviron
+
+
+def _same(left, right):
+    # Unlike ==, tells true from 1 and 1 from 1.0, which print differently.
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(_same(a, b) for a, b in zip(left, right))
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(_same(left[name], right[name]) for name in left)
+    return type(left) is type(right) and left == right
+
+
+class Definition:
+    def __init__(self, name, node, value, reads):
+        self.name = name
+        self.node = node
+        self.value = value
+        self.reads = reads
+
+
+class TrackedItem:
+    def __init__(self, node, path, reads):
+        self.node = node
+        self.path = path
+        self.reads = reads
+
+
+class TrackedEnviron(RecordedEnviron):
+    # Charges every lookup to the definition or item being evaluated, so
+    # env() and any context function reading the environment are tracked.
+    def __init__(self, environ, interpreter):
+        super().__init__(environ)
+        self.interpreter = interpreter
+    
+    def __getitem__(self, name):
+        reads = self.interpreter._reads
+        if reads is not None:
+            reads.add(name)
+        return super().__getitem__(name)
+
+
+class TrackingInterpreter(ZovInterpreter):
+    # Records what every variable definition and item read while it was
+    # evaluated: the definitions (by position) of the variables it used,
+    # and the environment variables it looked up. update() follows these
+    # edges to recompute only what an environment or variable change
+    # reaches.
+    def __init__(self, use_decimal=False, environ=None, stats=None, functions=None):
+        super().__init__(use_decimal, environ, stats, functions)
+        self.environ = TrackedEnviron(self.environ, self)
+        self.definitions = []
+        self.items = {}
+        self.overrides = {}
+        self.env_values = self.environ.read
+        self._versions = {}
+        self._reads = None
+    
+    def _read(self, name):
+        if self._reads is not None:
+            version = self._versions.get(name)
+            if version is not None:
+                self._reads.add(version)
+    
+    def eval_value(self, value):
+        if type(value) is VariableRef:
+            self._read(value.name)
+        return super().eval_value(value)
+    
+    def eval_interpolated_string(self, interp_str):
+        for part_type, part_value in interp_str.parts:
+            if part_type == 'var':
+                self._read(part_value)
+        return super().eval_interpolated_string(interp_str)
+    
+    def interpolate(self, value):
+        if isinstance(value, Identifier):
+            self._read('$' + value.value)
+        return super().interpolate(value)
+    
+    def eval_variable(self, var_node):
+        if var_node.name in self.overrides:
+            # Not evaluated, so everything visible here may be read once
+            # the override is dropped.
+            value, reads = self.overrides[var_node.name], set(self._versions.values())
+        else:
+            value, reads = self._evaluate(self.eval_value, var_node.value)
+        self._versions[var_node.name] = len(self.definitions)
+        self.definitions.append(Definition(var_node.name, var_node, value, reads))
+        self.variables[var_node.name] = value
+    
+    def eval_item(self, item, path):
+        values, reads = self._evaluate(super().eval_item, item, path)
+        self.items[f'{path}.{item.name}'] = TrackedItem(item, path, reads)
+        return values
+    
+    def _evaluate(self, func, *args):
+        reads = set()
+        self._reads = reads
+        try:
+            return func(*args), reads
+        finally:
+            self._reads = None
+    
+    def _recompute(self, func, reads, values, *args):
+        # Evaluates again with each variable bound to the definition that
+        # was visible the first time, not the one visible now.
+        variables = self.variables
+        versions = self._versions
+        self.variables = {}
+        self._versions = {}
+        for version in reads:
+            if isinstance(version, int):
+                definition = self.definitions[version]
+                self.variables[definition.name] = values.get(version, definition.value)
+                self._versions[definition.name] = version
+        try:
+            return self._evaluate(func, *args)
+        finally:
+            self.variables = variables
+            self._versions = versions
+    
+    def dependents(self, variables=(), environ=()):
+        dirty = set(environ)
+        for version, definition in enumerate(self.definitions):
+            if definition.name in variables or not dirty.isdisjoint(definition.reads):
+                dirty.add(version)
+        return [path for path, item in self.items.items() if not dirty.isdisjoint(item.reads)]
+    
+    def update(self, environ=None, variables=None):
+        environ = self.environ.environ if environ is None else environ
+        overrides = self.overrides if variables is None else dict(variables)
+        defined = {definition.name for definition in self.definitions}
+        for name in overrides:
+            if name not in defined:
+                raise ValueError(f"Undefined variable: {name}")
+        
+        previous_environ = self.environ
+        self.environ = TrackedEnviron(environ, self)
+        try:
+            dirty = {name for name, value in self.env_values.items() if environ.get(name) != value}
+            values = {}
+            reads = {}
+            for version, definition in enumerate(self.definitions):
+                if definition.name in overrides:
+                    value = overrides[definition.name]
+                elif definition.name in self.overrides or not dirty.isdisjoint(definition.reads):
+                    value, reads[version] = self._recompute(self.eval_value, definition.reads, values, definition.node.value)
+                else:
+                    continue
+                if not _same(value, definition.value):
+                    values[version] = value
+                    dirty.add(version)
+            
+            changed = {}
+            for path, item in self.items.items():
+                if not dirty.isdisjoint(item.reads):
+                    result, item_reads = self._recompute(ZovInterpreter.eval_item, item.reads, values, self, item.node, item.path)
+                    reads[path] = item_reads
+                    if not _same(result, self.data[item.path]['__items__'][item.node.name]):
+                        changed[path] = result
+        except BaseException:
+            self.environ = previous_environ
+            raise
+        
+        for version, value in values.items():
+            definition = self.definitions[version]
+            definition.value = value
+            if self._versions[definition.name] == version:
+                self.variables[definition.name] = value
+        for key, item_reads in reads.items():
+            if isinstance(key, int):
+                self.definitions[key].reads = item_reads
+            else:
+                self.items[key].reads = item_reads
+        for path, result in changed.items():
+            item = self.items[path]
+            self.data[item.path]['__items__'][item.node.name] = result
+        for name in self.env_values:
+            self.environ.read.setdefault(name, environ.get(name))
+        self.env_values = self.environ.read
+        self.overrides = overrides
+        return list(changed)